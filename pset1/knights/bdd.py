@@ -0,0 +1,393 @@
+import json
+import math
+
+from logic import And, Biconditional, Implication, Not, Or, Sentence, Symbol
+
+# Node ids of the two terminal nodes
+FALSE = 0
+TRUE = 1
+
+
+class BDD():
+    """
+    Manager for reduced ordered binary decision diagrams (BDDs).
+
+    Nodes are integer ids. Each non-terminal node tests the variable at
+    one level of a fixed order, with a `low` child for when the variable
+    is false and a `high` child for when it is true. A unique table
+    guarantees that every boolean function has exactly one node, so two
+    sentences are equivalent exactly when they compile to the same id.
+    Results of `apply` are cached, so combining two diagrams takes time
+    proportional to the product of their sizes at most.
+    """
+
+    def __init__(self, order=()):
+        self.order = []
+        self.levels = dict()
+
+        # Number of symbols in the order given up front, over which
+        # assignments are counted even if later queries add symbols
+        self.fixed = len(order)
+
+        # Terminal nodes sit below every variable
+        self.node_levels = [math.inf, math.inf]
+        self.lows = [None, None]
+        self.highs = [None, None]
+
+        self.unique = dict()
+        self.cache = dict()
+        self.compiled = dict()
+        for name in order:
+            self.variable(name)
+
+    def __len__(self):
+        return len(self.node_levels)
+
+    def variable(self, name):
+        """
+        Returns the node for the symbol `name`, placing the symbol below
+        every known symbol in the order if it has not been seen before.
+        """
+        if name not in self.levels:
+            self.levels[name] = len(self.order)
+            self.order.append(name)
+        return self.node(self.levels[name], FALSE, TRUE)
+
+    def node(self, level, low, high):
+        """
+        Returns the node testing the variable at `level`, creating it only
+        if no equal node exists and its children differ.
+        """
+        if low == high:
+            return low
+        key = (level, low, high)
+        if key not in self.unique:
+            self.unique[key] = len(self.node_levels)
+            self.node_levels.append(level)
+            self.lows.append(low)
+            self.highs.append(high)
+        return self.unique[key]
+
+    def negate(self, u):
+        """
+        Returns the node for the negation of node `u`.
+        """
+        return self.apply("xor", u, TRUE)
+
+    def apply(self, operation, u, v):
+        """
+        Returns the node for `operation` ("and", "or", "xor" or "iff")
+        applied to nodes `u` and `v`.
+        """
+        if operation not in ("and", "or", "xor", "iff"):
+            raise ValueError(f"unknown operation {operation}")
+        result = self.lookup(operation, u, v)
+        if result is not None:
+            return result
+
+        # Work through pairs of nodes with an explicit stack, so that deep
+        # diagrams do not hit the recursion limit
+        stack = [(u, v, False)]
+        while stack:
+            u, v, expanded = stack.pop()
+            if (operation, min(u, v), max(u, v)) in self.cache:
+                continue
+
+            # Split on the topmost variable of the two nodes
+            level = min(self.node_levels[u], self.node_levels[v])
+            u_low, u_high = self.cofactors(u, level)
+            v_low, v_high = self.cofactors(v, level)
+            if expanded:
+                self.cache[(operation, min(u, v), max(u, v))] = self.node(
+                    level,
+                    self.lookup(operation, u_low, v_low),
+                    self.lookup(operation, u_high, v_high)
+                )
+                continue
+            stack.append((u, v, True))
+            for pair in [(u_low, v_low), (u_high, v_high)]:
+                if self.lookup(operation, *pair) is None:
+                    stack.append(pair + (False,))
+
+        return self.lookup(operation, u, v)
+
+    def lookup(self, operation, u, v):
+        """
+        Returns the result of `apply` if it is decided by terminals or
+        equal operands, or already cached, and None otherwise.
+        """
+        if operation == "and":
+            if u == FALSE or v == FALSE:
+                return FALSE
+            if u == TRUE or u == v:
+                return v
+            if v == TRUE:
+                return u
+        elif operation == "or":
+            if u == TRUE or v == TRUE:
+                return TRUE
+            if u == FALSE or u == v:
+                return v
+            if v == FALSE:
+                return u
+        elif operation == "xor":
+            if u == v:
+                return FALSE
+            if u == FALSE:
+                return v
+            if v == FALSE:
+                return u
+        elif operation == "iff":
+            if u == v:
+                return TRUE
+            if u == TRUE:
+                return v
+            if v == TRUE:
+                return u
+
+        # Every operation is commutative, so cache operands in order
+        return self.cache.get((operation, min(u, v), max(u, v)))
+
+    def cofactors(self, u, level):
+        """
+        Returns the children of `u` for the variable at `level` being
+        false and true, which are `u` itself if `u` does not test it.
+        """
+        if self.node_levels[u] == level:
+            return self.lows[u], self.highs[u]
+        return u, u
+
+    def compile(self, sentence):
+        """
+        Returns the node equivalent to a logical sentence.
+        """
+        Sentence.validate(sentence)
+        if sentence in self.compiled:
+            return self.compiled[sentence]
+
+        if isinstance(sentence, Symbol):
+            result = self.variable(sentence.name)
+        elif isinstance(sentence, Not):
+            result = self.negate(self.compile(sentence.operand))
+        elif isinstance(sentence, And):
+            result = self.combine("and", [
+                self.compile(conjunct) for conjunct in sentence.conjuncts
+            ], TRUE)
+        elif isinstance(sentence, Or):
+            result = self.combine("or", [
+                self.compile(disjunct) for disjunct in sentence.disjuncts
+            ], FALSE)
+        elif isinstance(sentence, Implication):
+            result = self.apply(
+                "or",
+                self.negate(self.compile(sentence.antecedent)),
+                self.compile(sentence.consequent)
+            )
+        elif isinstance(sentence, Biconditional):
+            result = self.apply(
+                "iff",
+                self.compile(sentence.left),
+                self.compile(sentence.right)
+            )
+        else:
+            raise TypeError(f"cannot compile {type(sentence).__name__}")
+
+        self.compiled[sentence] = result
+        return result
+
+    def combine(self, operation, nodes, empty):
+        """
+        Combines a list of nodes with `operation` pairwise, as a balanced
+        tree, which keeps intermediate diagrams smaller than folding them
+        one at a time. Returns `empty` for an empty list.
+        """
+        if not nodes:
+            return empty
+        while len(nodes) > 1:
+            nodes = [
+                self.apply(operation, nodes[i], nodes[i + 1])
+                if i + 1 < len(nodes) else nodes[i]
+                for i in range(0, len(nodes), 2)
+            ]
+        return nodes[0]
+
+    def entails(self, u, query):
+        """
+        Checks if node `u` entails a query, given as a sentence or a node.
+        """
+        if isinstance(query, Sentence):
+            query = self.compile(query)
+        return self.apply("and", u, self.negate(query)) == FALSE
+
+    def reachable(self, u):
+        """
+        Returns the non-terminal nodes reachable from `u`, ordered so that
+        every node comes after its children.
+        """
+        order = []
+        visited = set()
+        stack = [(u, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if node in (FALSE, TRUE) or (node in visited and not expanded):
+                continue
+            if expanded:
+                order.append(node)
+                continue
+            visited.add(node)
+            stack.append((node, True))
+            stack.append((self.lows[node], False))
+            stack.append((self.highs[node], False))
+        return order
+
+    def count(self, u):
+        """
+        Returns the number of assignments to the symbols the manager was
+        created with under which node `u` is true, in time linear in its
+        size. Symbols added to the order later are counted only if `u`
+        depends on them, so compiling queries never changes the count.
+        """
+        nodes = self.reachable(u)
+        variables = max(
+            [self.fixed] + [self.node_levels[node] + 1 for node in nodes]
+        )
+
+        def level(node):
+            return variables if node in (FALSE, TRUE) else self.node_levels[node]
+
+        counts = {FALSE: 0, TRUE: 1}
+        for node in nodes:
+            counts[node] = sum(
+                counts[child] * 2 ** (level(child) - level(node) - 1)
+                for child in (self.lows[node], self.highs[node])
+            )
+        return counts[u] * 2 ** level(u)
+
+    def forced(self, u):
+        """
+        Returns a dictionary mapping every symbol that has the same value
+        in all assignments satisfying node `u` to that value, in time
+        linear in the size of `u`. Returns None if `u` is unsatisfiable.
+        """
+        if u == FALSE:
+            return None
+        variables = len(self.order)
+
+        def level(node):
+            return variables if node in (FALSE, TRUE) else self.node_levels[node]
+
+        # Track which values each level takes along satisfying paths, and
+        # mark ranges of levels skipped by an edge, which take both values
+        can_be_true = [False] * variables
+        can_be_false = [False] * variables
+        skipped = [0] * (variables + 1)
+
+        def skip(start, stop):
+            skipped[start] += 1
+            skipped[stop] -= 1
+
+        skip(0, level(u))
+        for node in self.reachable(u):
+            for child, value in [(self.lows[node], False),
+                                 (self.highs[node], True)]:
+                if child == FALSE:
+                    continue
+                if value:
+                    can_be_true[level(node)] = True
+                else:
+                    can_be_false[level(node)] = True
+                skip(level(node) + 1, level(child))
+
+        forced = dict()
+        depth = 0
+        for i, name in enumerate(self.order):
+            depth += skipped[i]
+            if depth > 0:
+                continue
+            if can_be_true[i] != can_be_false[i]:
+                forced[name] = can_be_true[i]
+        return forced
+
+    def to_dict(self, roots):
+        """
+        Returns a JSON-serializable description of the nodes reachable
+        from the list of nodes `roots`.
+        """
+        ids = {FALSE: FALSE, TRUE: TRUE}
+        nodes = []
+        for root in roots:
+            for node in self.reachable(root):
+                if node not in ids:
+                    ids[node] = len(nodes) + 2
+                    nodes.append([
+                        self.node_levels[node],
+                        ids[self.lows[node]],
+                        ids[self.highs[node]]
+                    ])
+        return {
+            "order": list(self.order),
+            "fixed": self.fixed,
+            "nodes": nodes,
+            "roots": [ids[root] for root in roots]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuilds the nodes described by `to_dict` in a new manager.
+        Returns the manager and the list of root nodes.
+        """
+        bdd = cls(data["order"])
+        bdd.fixed = data.get("fixed", bdd.fixed)
+        ids = [FALSE, TRUE]
+        for level, low, high in data["nodes"]:
+            ids.append(bdd.node(level, ids[low], ids[high]))
+        return bdd, [ids[root] for root in data["roots"]]
+
+
+def order_symbols(sentence):
+    """
+    Returns the symbols of a sentence in the order they are first met
+    by a depth-first walk, which keeps symbols that appear together in
+    a subformula close together in the variable order.
+    """
+    order = dict()
+    stack = [sentence]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Symbol):
+            order.setdefault(node.name, None)
+        else:
+            stack.extend(reversed(node.children()))
+    return list(order)
+
+
+def compile_bdd(sentence):
+    """
+    Compiles a sentence into a BDD using the `order_symbols` heuristic.
+    Returns the manager and the root node.
+    """
+    bdd = BDD(order_symbols(sentence))
+    return bdd, bdd.compile(sentence)
+
+
+def bdd_check(knowledge, query):
+    """Checks if knowledge base entails query, using a compiled BDD."""
+    bdd, root = compile_bdd(knowledge)
+    return bdd.entails(root, query)
+
+
+def dump(bdd, roots, filename):
+    """
+    Saves the nodes reachable from `roots` to a JSON file.
+    """
+    with open(filename, "w") as f:
+        json.dump(bdd.to_dict(roots), f)
+
+
+def load(filename):
+    """
+    Loads nodes saved by `dump`. Returns the manager and the root nodes.
+    """
+    with open(filename) as f:
+        return BDD.from_dict(json.load(f))
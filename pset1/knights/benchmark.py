@@ -0,0 +1,132 @@
+import argparse
+import json
+import sys
+import time
+
+from bdd import compile_bdd
+from generator import generate
+from logic import *
+from sat import sat_check
+from truthtable import truth_table_check
+
+# Sizes of the knowledge bases to check, in symbols for chains
+# and in characters for puzzles
+SIZES = {
+    "chain": [4, 8, 12, 16, 18, 22, 26, 50, 100, 500, 1000],
+    "puzzle": [2, 4, 6, 8, 9, 10, 12, 16, 20, 24]
+}
+
+# Largest number of symbols checked by each backend that enumerates models
+LIMITS = {
+    "model_check": 18,
+    "parallel_model_check": 18,
+    "entailed": 18,
+    "truth_table": 26
+}
+
+# Backends to time, in order
+BACKENDS = [
+    "model_check", "parallel_model_check", "entailed",
+    "truth_table", "bdd_check", "sat_check"
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time entailment backends on growing knowledge bases."
+    )
+    parser.add_argument("--family", choices=sorted(SIZES), default="chain",
+                        help="implication chains or generated puzzles")
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        help="sizes to check instead of the defaults")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the puzzle generator")
+    parser.add_argument("--output", metavar="FILE",
+                        help="save the timings as JSON")
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'symbols':>8}" + "".join(
+        f" {name:>21}" for name in BACKENDS
+    ))
+    results = []
+    for size in args.sizes or SIZES[args.family]:
+        if args.family == "chain":
+            knowledge, queries = chain(size)
+        else:
+            knowledge, queries = generate(size, args.seed)
+        symbols = len(knowledge.symbols())
+
+        # Time each backend only while it finishes in reasonable time
+        times = dict()
+        answers = set()
+        row = f"{size:>6} {symbols:>8}"
+        for name in BACKENDS:
+            if symbols > LIMITS.get(name, symbols):
+                times[name] = None
+                row += f" {'-':>21}"
+                continue
+            answer, times[name] = timed(name, knowledge, queries)
+            answers.add(answer)
+            row += f" {times[name]:>20.4f}s"
+        print(row)
+        if len(answers) != 1:
+            sys.exit(f"Backends disagree at size {size}")
+
+        results.append({
+            "size": size,
+            "symbols": symbols,
+            "entailed": [
+                str(query) for query, entails in zip(queries, answers.pop())
+                if entails
+            ],
+            "seconds": times
+        })
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "family": args.family,
+                "seed": args.seed,
+                "results": results
+            }, f, indent=4)
+
+
+def chain(size):
+    """
+    Return a knowledge base of `size` symbols, where the first symbol is
+    true and each symbol implies the next, and a query for the last symbol.
+    """
+    symbols = [Symbol(f"S{i}") for i in range(size)]
+    knowledge = And(symbols[0])
+    for previous, following in zip(symbols, symbols[1:]):
+        knowledge.add(Implication(previous, following))
+    return hashcons(knowledge), [symbols[-1]]
+
+
+def timed(name, knowledge, queries):
+    """
+    Return a tuple of whether the knowledge base entails each query,
+    checked with backend `name`, and the number of seconds it took.
+    """
+    start = time.perf_counter()
+    if name == "entailed":
+        results = entailed(knowledge, queries)
+        answers = tuple(results[query] == ENTAILED for query in queries)
+    elif name == "bdd_check":
+
+        # Compile the knowledge base once for every query
+        bdd, root = compile_bdd(knowledge)
+        answers = tuple(bdd.entails(root, query) for query in queries)
+    else:
+        check = {
+            "model_check": model_check,
+            "parallel_model_check": parallel_model_check,
+            "truth_table": truth_table_check,
+            "sat_check": sat_check
+        }[name]
+        answers = tuple(check(knowledge, query) for query in queries)
+    return answers, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
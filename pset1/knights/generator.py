@@ -0,0 +1,105 @@
+import random
+import string
+import sys
+
+from logic import *
+
+# Largest depth of nesting in a generated statement
+DEPTH = 2
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python generator.py characters [seed]")
+    characters = int(sys.argv[1])
+    seed = int(sys.argv[2]) if len(sys.argv) == 3 else None
+
+    knowledge, symbols = generate(characters, seed)
+    print(knowledge.formula())
+    results = entailed(knowledge, symbols)
+    for symbol in symbols:
+        if results[symbol] == ENTAILED:
+            print(f"    {symbol}")
+
+
+def generate(characters, seed=None, statements=1, depth=DEPTH):
+    """
+    Generate a knights and knaves puzzle with `characters` characters,
+    each of whom says `statements` random statements about the others.
+
+    Knights always tell the truth and knaves always lie. Characters are
+    first given a hidden role at random, and any statement that would
+    contradict the speaker's role is negated, so every puzzle has at least
+    one solution.
+
+    Return the knowledge base and the list of symbols of the puzzle,
+    ordered as each character's knight symbol followed by its knave symbol.
+    Both are passed through `hashcons`, so repeated subformulas are
+    shared and the knowledge base cannot be added to.
+    """
+    rng = random.Random(seed)
+    names = character_names(characters)
+    knights = [Symbol(f"{name} is a Knight") for name in names]
+    knaves = [Symbol(f"{name} is a Knave") for name in names]
+    roles = {knight.name: rng.random() < 0.5 for knight in knights}
+    roles.update({
+        knave.name: not roles[knight.name]
+        for knight, knave in zip(knights, knaves)
+    })
+
+    knowledge = And()
+    for knight, knave in zip(knights, knaves):
+
+        # Exclusive or
+        knowledge.add(Or(knight, knave))
+        knowledge.add(Not(And(knight, knave)))
+
+    for knight in knights:
+        for _ in range(statements):
+            statement = random_statement(rng, knights, knaves, depth)
+
+            # A character is a knight if, and only if, their statement is true
+            if statement.evaluate(roles) != roles[knight.name]:
+                statement = Not(statement)
+            knowledge.add(Biconditional(knight, statement))
+
+    symbols = [
+        hashcons(symbol) for pair in zip(knights, knaves) for symbol in pair
+    ]
+    return hashcons(knowledge), symbols
+
+
+def random_statement(rng, knights, knaves, depth):
+    """
+    Return a random statement about the characters, nested at most
+    `depth` levels deep.
+    """
+    if depth == 0 or rng.random() < 0.3:
+        return rng.choice(knights + knaves)
+    kind = rng.choice([Not, And, Or, Biconditional])
+    if kind is Not:
+        return Not(random_statement(rng, knights, knaves, depth - 1))
+    if kind is Biconditional:
+        return Biconditional(
+            random_statement(rng, knights, knaves, depth - 1),
+            random_statement(rng, knights, knaves, depth - 1)
+        )
+    return kind(*[
+        random_statement(rng, knights, knaves, depth - 1)
+        for _ in range(rng.randint(2, 3))
+    ])
+
+
+def character_names(count):
+    """
+    Return `count` character names: A to Z, then A1 to Z1, and so on.
+    """
+    letters = string.ascii_uppercase
+    return [
+        letters[i % 26] + (str(i // 26) if i >= 26 else "")
+        for i in range(count)
+    ]
+
+
+if __name__ == "__main__":
+    main()
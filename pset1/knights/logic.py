@@ -1,19 +1,140 @@
 import itertools
+import math
+import multiprocessing
+import os
+import weakref
+
+# Possible answers to a query about a knowledge base
+ENTAILED = "entailed"
+CONTRADICTED = "contradicted"
+UNDETERMINED = "undetermined"
+
+# In worker processes, flag shared with the parent, set once the answer is known
+STOP = None
+
+# Instructions of compiled sentences, each with one argument: push the
+# value of a symbol or a constant, negate the top value, compare the top
+# two values, or jump to an instruction if the top value is false (true)
+# and otherwise pop it
+PUSH = 0
+CONSTANT = 1
+NOT = 2
+IFF = 3
+FALSE_OR_POP = 4
+TRUE_OR_POP = 5
+
+# Steps of compiling a sentence
+COMPILE = 0
+EMIT = 1
+JUMP = 2
+TARGET = 3
 
 
 class Sentence():
 
+    __slots__ = ("_hash", "_symbols", "_formula", "_frozen", "__weakref__")
+
+    def __init__(self):
+        self._hash = None
+        self._symbols = None
+        self._formula = None
+        self._frozen = False
+
+    def __hash__(self):
+        if self._frozen:
+            return self._hash
+        return self.compute_hash()
+
+    def compute_hash(self):
+        """Computes the hash of the sentence from its subformulas."""
+        raise Exception("nothing to hash")
+
+    def __reduce__(self):
+        """
+        Pickles the sentence as a call to its constructor, so that its
+        hash, which depends on the process's string hash seed, is never
+        copied and is recomputed wherever it is unpickled.
+        """
+        return type(self), tuple(self.children()), self._frozen
+
+    def __setstate__(self, frozen):
+        if frozen and not self._frozen:
+            self.freeze()
+
+    def freeze(self):
+        """
+        Marks the sentence as one that can no longer change, which lets
+        it cache its hash, symbols and formula. Only sentences whose
+        subformulas can no longer change either may be frozen.
+        """
+        self._frozen = True
+        self._hash = self.compute_hash()
+
+    def freeze_if_fixed(self):
+        """Freezes the sentence if none of its subformulas can change."""
+        if all(child._frozen for child in self.children()):
+            self.freeze()
+
+    def hash_differs(self, other):
+        """
+        Checks if two sentences are known to differ from their cached
+        hashes, without computing the hash of a sentence that can change.
+        """
+        return self._frozen and other._frozen and self._hash != other._hash
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
 
+    def evaluate_partial(self, model):
+        """
+        Evaluates the logical sentence in a model that may leave some
+        symbols unassigned. Returns True or False if the sentence has that
+        value however the missing symbols are assigned, or None otherwise.
+        """
+        raise Exception("nothing to evaluate")
+
     def formula(self):
         """Returns string formula representing logical sentence."""
+        if not self._frozen:
+            return self.build_formula()
+        if self._formula is None:
+            self._formula = self.build_formula()
+        return self._formula
+
+    def build_formula(self):
         return ""
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        """
+        Returns a frozenset of all symbols in the sentence, cached once
+        the sentence can no longer change.
+        """
+        if self._symbols is not None:
+            return self._symbols
+        symbols = frozenset().union(
+            *[child.symbol_set() for child in self.children()]
+        )
+        if self._frozen:
+            self._symbols = symbols
+        return symbols
+
+    def children(self):
+        """Returns the immediate subformulas of the sentence."""
+        return []
+
+    def same_children(self, other):
+        """Checks if two sentences have the very same subformula objects."""
+        children = self.children()
+        others = other.children()
+        return len(children) == len(others) and all(
+            child is other_child
+            for child, other_child in zip(children, others)
+        )
 
     @classmethod
     def validate(cls, sentence):
@@ -44,14 +165,19 @@ class Sentence():
 
 class Symbol(Sentence):
 
+    __slots__ = ("name",)
+
     def __init__(self, name):
+        super().__init__()
         self.name = name
+        self.freeze()
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (
+            isinstance(other, Symbol) and self.name == other.name
+        )
 
-    def __hash__(self):
-        return hash(("symbol", self.name))
+    __hash__ = Sentence.__hash__
 
     def __repr__(self):
         return self.name
@@ -62,202 +188,626 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
-    def formula(self):
+    def evaluate_partial(self, model):
+        value = model.get(self.name)
+        return None if value is None else bool(value)
+
+    def __reduce__(self):
+        return Symbol, (self.name,)
+
+    def compute_hash(self):
+        return hash(("symbol", self.name))
+
+    def build_formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def symbol_set(self):
+        if self._symbols is None:
+            self._symbols = frozenset([self.name])
+        return self._symbols
 
 
 class Not(Sentence):
+
+    __slots__ = ("operand",)
+
     def __init__(self, operand):
+        super().__init__()
         Sentence.validate(operand)
         self.operand = operand
+        self.freeze_if_fixed()
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (
+            isinstance(other, Not)
+            and not self.hash_differs(other)
+            and self.operand == other.operand
+        )
 
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+    __hash__ = Sentence.__hash__
 
     def __repr__(self):
         return f"Not({self.operand})"
 
+    def compute_hash(self):
+        return hash(("not", hash(self.operand)))
+
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
-    def formula(self):
+    def evaluate_partial(self, model):
+        value = self.operand.evaluate_partial(model)
+        return None if value is None else not value
+
+    def build_formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def children(self):
+        return [self.operand]
 
 
 class And(Sentence):
+
+    __slots__ = ("conjuncts",)
+
     def __init__(self, *conjuncts):
+        super().__init__()
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
-
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+        return self is other or (
+            isinstance(other, And)
+            and not self.hash_differs(other)
+            and self.conjuncts == other.conjuncts
         )
 
+    __hash__ = Sentence.__hash__
+
     def __repr__(self):
         conjunctions = ", ".join(
             [str(conjunct) for conjunct in self.conjuncts]
         )
         return f"And({conjunctions})"
 
+    def compute_hash(self):
+        return hash(
+            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+        )
+
     def add(self, conjunct):
         Sentence.validate(conjunct)
+        if self._frozen:
+            raise ValueError("cannot add to a shared sentence")
         self.conjuncts.append(conjunct)
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
-    def formula(self):
+    def evaluate_partial(self, model):
+        result = True
+        for conjunct in self.conjuncts:
+            value = conjunct.evaluate_partial(model)
+            if value is False:
+                return False
+            if value is None:
+                result = None
+        return result
+
+    def build_formula(self):
         if len(self.conjuncts) == 1:
             return self.conjuncts[0].formula()
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def children(self):
+        return self.conjuncts
 
 
 class Or(Sentence):
+
+    __slots__ = ("disjuncts",)
+
     def __init__(self, *disjuncts):
+        super().__init__()
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
         self.disjuncts = list(disjuncts)
+        self.freeze_if_fixed()
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
-
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
+        return self is other or (
+            isinstance(other, Or)
+            and not self.hash_differs(other)
+            and self.disjuncts == other.disjuncts
         )
 
+    __hash__ = Sentence.__hash__
+
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
         return f"Or({disjuncts})"
 
+    def compute_hash(self):
+        return hash(
+            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
+        )
+
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
-    def formula(self):
+    def evaluate_partial(self, model):
+        result = False
+        for disjunct in self.disjuncts:
+            value = disjunct.evaluate_partial(model)
+            if value is True:
+                return True
+            if value is None:
+                result = None
+        return result
+
+    def build_formula(self):
         if len(self.disjuncts) == 1:
             return self.disjuncts[0].formula()
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def children(self):
+        return self.disjuncts
 
 
 class Implication(Sentence):
+
+    __slots__ = ("antecedent", "consequent")
+
     def __init__(self, antecedent, consequent):
+        super().__init__()
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
         self.antecedent = antecedent
         self.consequent = consequent
+        self.freeze_if_fixed()
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (
+            isinstance(other, Implication)
+            and not self.hash_differs(other)
+            and self.antecedent == other.antecedent
+            and self.consequent == other.consequent
+        )
 
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+    __hash__ = Sentence.__hash__
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
 
+    def compute_hash(self):
+        return hash(
+            ("implies", hash(self.antecedent), hash(self.consequent))
+        )
+
     def evaluate(self, model):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
-    def formula(self):
+    def evaluate_partial(self, model):
+        antecedent = self.antecedent.evaluate_partial(model)
+        if antecedent is False:
+            return True
+        consequent = self.consequent.evaluate_partial(model)
+        if consequent is True:
+            return True
+        if antecedent is None or consequent is None:
+            return None
+        return False
+
+    def build_formula(self):
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def children(self):
+        return [self.antecedent, self.consequent]
 
 
 class Biconditional(Sentence):
+
+    __slots__ = ("left", "right")
+
     def __init__(self, left, right):
+        super().__init__()
         Sentence.validate(left)
         Sentence.validate(right)
         self.left = left
         self.right = right
+        self.freeze_if_fixed()
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (
+            isinstance(other, Biconditional)
+            and not self.hash_differs(other)
+            and self.left == other.left
+            and self.right == other.right
+        )
 
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+    __hash__ = Sentence.__hash__
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
+    def compute_hash(self):
+        return hash(("biconditional", hash(self.left), hash(self.right)))
+
     def evaluate(self, model):
         return ((self.left.evaluate(model)
                  and self.right.evaluate(model))
                 or (not self.left.evaluate(model)
                     and not self.right.evaluate(model)))
 
-    def formula(self):
+    def evaluate_partial(self, model):
+        left = self.left.evaluate_partial(model)
+        if left is None:
+            return None
+        right = self.right.evaluate_partial(model)
+        if right is None:
+            return None
+        return left == right
+
+    def build_formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
-
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
-
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
-
-        # If model has an assignment for each symbol
-        if not symbols:
-
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
+    def children(self):
+        return [self.left, self.right]
+
+
+# Canonical copies of every shared sentence still in use, keyed by the
+# sentence type and the identities of its (canonical) subformulas
+SHARED = weakref.WeakValueDictionary()
+
+
+def hashcons(sentence):
+    """
+    Returns a canonical copy of a sentence in which structurally equal
+    subformulas are the same object, shared with every other sentence
+    passed through this function. Shared sentences are frozen, so they
+    cache their hash, symbols and formula and cannot be modified.
+    Conjunctions are copied rather than frozen in place, so the sentence
+    passed in can still be added to.
+    """
+    canonical = dict()
+    stack = [(sentence, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in canonical:
+            continue
+
+        # Make every subformula canonical before the node itself
+        if not expanded:
+            Sentence.validate(node)
+            stack.append((node, True))
+            for child in node.children():
+                if id(child) not in canonical:
+                    stack.append((child, False))
+            continue
+
+        children = [canonical[id(child)] for child in node.children()]
+        if isinstance(node, Symbol):
+            key = (Symbol, node.name)
         else:
+            key = (type(node),) + tuple(id(child) for child in children)
+        shared = SHARED.get(key)
+        if shared is None:
+            if node._frozen and all(
+                child is canonical_child
+                for child, canonical_child in zip(node.children(), children)
+            ):
+                shared = node
+            else:
+                shared = type(node)(*children)
+                shared.freeze()
+            SHARED[key] = shared
+        canonical[id(node)] = shared
+    return canonical[id(sentence)]
+
+
+class Program():
+    """
+    A logical sentence compiled to a flat list of postfix instructions.
+
+    The program evaluates the sentence with an explicit stack over a
+    sequence of truth values indexed like `symbols`, rather than through
+    recursive calls over a dictionary model, so deeply nested sentences
+    never hit the recursion limit and each evaluation avoids building a
+    model dictionary. Conjunctions, disjunctions and implications jump
+    past their remaining operands once their value is decided, as the
+    recursive `Sentence.evaluate`, which remains the reference, does.
+    """
+
+    def __init__(self, sentence, symbols=None):
+        Sentence.validate(sentence)
+        self.symbols = list(symbols) if symbols is not None else None
+        index = (
+            {name: i for i, name in enumerate(self.symbols)}
+            if self.symbols is not None else dict()
+        )
 
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
-
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
+        # Work through a stack of sentences to compile, jumps to emit and
+        # lists of jumps to point at the current end of the program
+        instructions = []
+        stack = [(COMPILE, sentence)]
+        while stack:
+            action, argument = stack.pop()
+            if action == JUMP:
+                operation, jumps = argument
+                jumps.append(len(instructions))
+                instructions.append([operation, None])
+                continue
+            if action == TARGET:
+                for jump in argument:
+                    instructions[jump][1] = len(instructions)
+                continue
+            if action == EMIT:
+                instructions.append([argument, None])
+                continue
+
+            node = argument
+            Sentence.validate(node)
+            if isinstance(node, Symbol):
+                if node.name not in index:
+                    if self.symbols is not None:
+                        raise Exception(f"variable {node.name} not in model")
+                    index[node.name] = len(index)
+                instructions.append([PUSH, index[node.name]])
+            elif isinstance(node, Not):
+                stack.append((EMIT, NOT))
+                stack.append((COMPILE, node.operand))
+            elif isinstance(node, (And, Or)):
+                if not node.children():
+                    instructions.append([CONSTANT, isinstance(node, And)])
+                    continue
+
+                # Skip the remaining operands once one decides the value
+                operation = (
+                    FALSE_OR_POP if isinstance(node, And) else TRUE_OR_POP
+                )
+                jumps = []
+                stack.append((TARGET, jumps))
+                for i, child in enumerate(reversed(node.children())):
+                    if i > 0:
+                        stack.append((JUMP, (operation, jumps)))
+                    stack.append((COMPILE, child))
+            elif isinstance(node, Implication):
+                jumps = []
+                stack.append((TARGET, jumps))
+                stack.append((COMPILE, node.consequent))
+                stack.append((JUMP, (TRUE_OR_POP, jumps)))
+                stack.append((EMIT, NOT))
+                stack.append((COMPILE, node.antecedent))
+            elif isinstance(node, Biconditional):
+                stack.append((EMIT, IFF))
+                stack.append((COMPILE, node.right))
+                stack.append((COMPILE, node.left))
+            else:
+                raise TypeError(f"cannot compile {type(node).__name__}")
+
+        self.instructions = [tuple(step) for step in instructions]
+
+        # Without a given order, symbols are numbered as first met
+        if self.symbols is None:
+            self.symbols = list(index)
+
+    def __len__(self):
+        return len(self.instructions)
+
+    def evaluate(self, values):
+        """
+        Evaluates the compiled sentence, where `values[i]` is the truth
+        value of the symbol `symbols[i]`.
+        """
+        instructions = self.instructions
+        stack = []
+        position = 0
+        end = len(instructions)
+        while position < end:
+            operation, argument = instructions[position]
+            position += 1
+            if operation == PUSH:
+                stack.append(values[argument])
+            elif operation == FALSE_OR_POP:
+                if stack[-1]:
+                    stack.pop()
+                else:
+                    position = argument
+            elif operation == TRUE_OR_POP:
+                if stack[-1]:
+                    position = argument
+                else:
+                    stack.pop()
+            elif operation == NOT:
+                stack[-1] = not stack[-1]
+            elif operation == IFF:
+                right = stack.pop()
+                stack[-1] = stack[-1] == right
+            else:
+                stack.append(argument)
+        return stack[-1]
 
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
 
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
+def model_check(knowledge, query):
+    """Checks if knowledge base entails query."""
 
-    # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    # Get all symbols in both knowledge and query, most frequent first
+    symbols = ordered_symbols(knowledge, query)
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def check_all(knowledge, query, symbols, model, stop=None):
+    """
+    Checks if knowledge base entails query, given a partial model that
+    assigns the first symbols of `symbols`. If `stop` is given, the check
+    gives up, returning True, as soon as `stop.value` is set.
+    """
+
+    # Give up if another process has already found the answer
+    if stop is not None and stop.value:
+        return True
+
+    # If knowledge base is false in model, no completion can refute query
+    knowledge_value = knowledge.evaluate_partial(model)
+    if knowledge_value is False:
+        return True
+
+    # If query is decided, every completion agrees with it
+    query_value = query.evaluate_partial(model)
+    if query_value is True:
+        return True
+    if knowledge_value is True and query_value is False:
+        return False
+
+    # If model has an assignment for each symbol
+    if len(model) == len(symbols):
+        if knowledge.evaluate(model):
+            return query.evaluate(model)
+        return True
+
+    # Choose the next symbol, trying it as true and then as false
+    p = symbols[len(model)]
+    for value in [True, False]:
+        model[p] = value
+        if not check_all(knowledge, query, symbols, model, stop):
+            del model[p]
+            return False
+    del model[p]
+    return True
+
+
+def parallel_model_check(knowledge, query, processes=None, split=None):
+    """
+    Checks if knowledge base entails query, enumerating models across a
+    pool of processes.
+
+    The first `split` symbols are fixed in every possible way, giving
+    2^split subproblems that are checked in parallel. By default there are
+    about four subproblems per process. As soon as any subproblem finds a
+    model of the knowledge base where the query is false, the remaining
+    workers are stopped and the answer is False.
+    """
+    symbols = ordered_symbols(knowledge, query)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if split is None:
+        split = math.ceil(math.log2(4 * processes))
+    split = min(split, len(symbols))
+
+    # Shared flag that tells every worker to stop
+    stop = multiprocessing.RawValue("b", 0)
+    subproblems = [
+        (knowledge, query, symbols, dict(zip(symbols, values)))
+        for values in itertools.product([True, False], repeat=split)
+    ]
+    with multiprocessing.Pool(
+        processes, initializer=init_worker, initargs=(stop,)
+    ) as pool:
+        for result in pool.imap_unordered(check_subproblem, subproblems):
+            if result is False:
+                stop.value = 1
+                return False
+    return True
+
+
+def init_worker(stop):
+    """Stores the shared stop flag in a worker process."""
+    global STOP
+    STOP = stop
+
+
+def check_subproblem(subproblem):
+    """
+    Checks one subproblem of `parallel_model_check` in a worker process.
+    Returns True or False, or None if the check was stopped early.
+    """
+    knowledge, query, symbols, model = subproblem
+    if not check_all(knowledge, query, symbols, model, STOP):
+        return False
+    return None if STOP.value else True
+
+
+def ordered_symbols(*sentences):
+    """
+    Returns the names of all symbols in the sentences, ordered from
+    most to least frequent, with ties broken by name.
+    """
+    frequencies = symbol_frequencies(*sentences)
+    return sorted(frequencies, key=lambda p: (-frequencies[p], p))
+
+
+def symbol_frequencies(*sentences):
+    """
+    Returns a dictionary mapping each symbol in the sentences to the
+    number of times it occurs in them.
+    """
+    frequencies = dict()
+    stack = list(sentences)
+    while stack:
+        sentence = stack.pop()
+        if isinstance(sentence, Symbol):
+            frequencies[sentence.name] = frequencies.get(sentence.name, 0) + 1
+        else:
+            stack.extend(sentence.children())
+    return frequencies
+
+
+def entailed(knowledge, queries):
+    """
+    Checks many queries against one knowledge base, enumerating the
+    models of the knowledge base only once.
+
+    Returns a dictionary mapping each query to ENTAILED if it is true in
+    every model of the knowledge base, CONTRADICTED if it is false in every
+    model, or UNDETERMINED otherwise. As with `model_check`, every query is
+    entailed by a knowledge base that has no models.
+    """
+    queries = list(queries)
+
+    # Get all symbols in both knowledge and queries
+    symbols = sorted(symbol_frequencies(knowledge, *queries))
+
+    # Compile every sentence to evaluate it directly on tuples of values
+    knowledge_program = Program(knowledge, symbols)
+    query_programs = [Program(query, symbols) for query in queries]
+
+    # Keep track of the truth values each query takes in models of the KB
+    seen_true = set()
+    seen_false = set()
+    open_queries = list(range(len(queries)))
+    for values in itertools.product([True, False], repeat=len(symbols)):
+        if not knowledge_program.evaluate(values):
+            continue
+        for index in open_queries:
+            if query_programs[index].evaluate(values):
+                seen_true.add(index)
+            else:
+                seen_false.add(index)
+
+        # Stop once no query can be entailed or contradicted
+        open_queries = [
+            index for index in open_queries
+            if not (index in seen_true and index in seen_false)
+        ]
+        if not open_queries:
+            break
+
+    results = dict()
+    for index, query in enumerate(queries):
+        if index in seen_true and index in seen_false:
+            results[query] = UNDETERMINED
+        elif index in seen_false:
+            results[query] = CONTRADICTED
+        else:
+            results[query] = ENTAILED
+    return results
@@ -0,0 +1,70 @@
+import os
+import pickle
+import subprocess
+import sys
+
+from logic import *
+
+
+def main():
+    if len(sys.argv) != 1:
+        sys.exit("Usage: python pickle_check.py")
+    sentences = example_sentences()
+    data = pickle.dumps(sentences)
+
+    # Load the sentences in a process with a different string hash seed
+    seed = "2" if os.environ.get("PYTHONHASHSEED") == "1" else "1"
+    environment = dict(os.environ, PYTHONHASHSEED=seed)
+    result = subprocess.run(
+        [sys.executable, "-c", LOAD],
+        input=data,
+        stdout=subprocess.PIPE,
+        env=environment,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        sys.exit("Pickled sentences changed in another process")
+    print(f"{len(sentences)} sentences survive pickling across hash seeds")
+
+
+def example_sentences():
+    """
+    Return sentences of every kind, frozen and not, some sharing
+    subformulas through `hashcons`.
+    """
+    A = Symbol("A")
+    B = Symbol("B")
+    C = Symbol("C")
+    knowledge = And(Or(A, B), Not(And(A, B)))
+    knowledge.add(Implication(A, Biconditional(B, C)))
+    return [
+        A,
+        Not(A),
+        Or(A, Not(B)),
+        Implication(Not(A), Or(B, C)),
+        Biconditional(A, And(B, C)),
+        knowledge,
+        hashcons(knowledge)
+    ]
+
+
+# Program run in the other process: unpickle the sentences from standard
+# input, and check that they equal, hash like and are found as freshly
+# built sentences, and that shared ones are still frozen
+LOAD = """
+import pickle
+import sys
+from pickle_check import example_sentences
+loaded = pickle.loads(sys.stdin.buffer.read())
+for sentence, expected in zip(loaded, example_sentences()):
+    assert sentence == expected and expected == sentence
+    assert hash(sentence) == hash(expected)
+    assert sentence in {expected} and expected in {sentence}
+    assert sentence.formula() == expected.formula()
+    assert sentence.symbols() == expected.symbols()
+    assert sentence._frozen == expected._frozen
+"""
+
+
+if __name__ == "__main__":
+    main()
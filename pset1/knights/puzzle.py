@@ -95,8 +95,9 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
+            results = entailed(knowledge, symbols)
             for symbol in symbols:
-                if model_check(knowledge, symbol):
+                if results[symbol] == ENTAILED:
                     print(f"    {symbol}")
 
 
@@ -0,0 +1,514 @@
+import heapq
+
+from logic import And, Biconditional, Implication, Not, Or, Sentence, Symbol
+
+# Number of conflicts between restarts, scaled by the Luby sequence
+RESTART_INTERVAL = 100
+
+# Factor by which variable activities decay after each conflict
+ACTIVITY_DECAY = 0.95
+
+
+class CNF():
+    """
+    Conjunctive normal form of logical sentences, built with the Tseitin
+    transformation. Every compound subformula gets an auxiliary variable
+    that is constrained to be equivalent to it, so the number of clauses
+    grows linearly with the size of the sentence.
+
+    Variables are positive integers and literals are nonzero integers,
+    negative for negated variables. Each auxiliary variable is fully
+    determined by the symbols, so the clauses have exactly one model for
+    every model of the sentences.
+    """
+
+    def __init__(self):
+        self.clauses = []
+        self.variables = dict()
+        self.count = 0
+        self.literals = dict()
+
+    def add(self, sentence):
+        """
+        Adds clauses asserting that `sentence` is true.
+        """
+        self.clauses.append([self.literal(sentence)])
+
+    def variable(self, name):
+        """
+        Returns the variable for the symbol `name`, creating it if needed.
+        """
+        if name not in self.variables:
+            self.variables[name] = self.new_variable()
+        return self.variables[name]
+
+    def new_variable(self):
+        self.count += 1
+        return self.count
+
+    def literal(self, sentence):
+        """
+        Returns a literal equivalent to `sentence`, adding the clauses
+        that define it the first time the sentence is seen.
+        """
+        Sentence.validate(sentence)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        if isinstance(sentence, Symbol):
+            literal = self.variable(sentence.name)
+        elif isinstance(sentence, Not):
+            literal = -self.literal(sentence.operand)
+        elif isinstance(sentence, And):
+            literal = self.conjunction(
+                [self.literal(conjunct) for conjunct in sentence.conjuncts]
+            )
+        elif isinstance(sentence, Or):
+            literal = -self.conjunction(
+                [-self.literal(disjunct) for disjunct in sentence.disjuncts]
+            )
+        elif isinstance(sentence, Implication):
+            literal = -self.conjunction([
+                self.literal(sentence.antecedent),
+                -self.literal(sentence.consequent)
+            ])
+        elif isinstance(sentence, Biconditional):
+            left = self.literal(sentence.left)
+            right = self.literal(sentence.right)
+            literal = self.new_variable()
+            self.clauses.extend([
+                [-literal, -left, right],
+                [-literal, left, -right],
+                [literal, left, right],
+                [literal, -left, -right]
+            ])
+        else:
+            raise TypeError(f"cannot convert {type(sentence).__name__}")
+
+        self.literals[sentence] = literal
+        return literal
+
+    def conjunction(self, literals):
+        """
+        Returns a new variable equivalent to the conjunction of `literals`.
+        """
+        variable = self.new_variable()
+        for literal in literals:
+            self.clauses.append([-variable, literal])
+        self.clauses.append([variable] + [-literal for literal in literals])
+        return variable
+
+
+class Solver():
+    """
+    CDCL SAT solver over clauses in the format of `CNF`.
+
+    Clauses are watched by two of their literals, so only clauses whose
+    watched literal becomes false are visited during unit propagation.
+    Each conflict is analyzed to learn a clause at the first unique
+    implication point, and the search jumps back to the level where that
+    clause becomes unit. Branching follows variable activity (VSIDS) with
+    saved phases, and the search restarts on a Luby schedule.
+    """
+
+    def __init__(self, clauses, count):
+        self.count = count
+        self.values = [None] * (count + 1)
+        self.levels = [0] * (count + 1)
+        self.reasons = [None] * (count + 1)
+        self.phases = [False] * (count + 1)
+        self.activity = [0.0] * (count + 1)
+        self.increment = 1.0
+        self.heap = [(0.0, variable) for variable in range(1, count + 1)]
+        self.trail = []
+        self.trail_limits = []
+        self.head = 0
+        self.clauses = []
+        self.watches = dict()
+        self.conflict = False
+
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def add_clause(self, clause):
+        """
+        Adds a clause before solving. Duplicate literals are removed and
+        tautologies are dropped. Sets self.conflict if the clauses are
+        already unsatisfiable.
+        """
+        clause = list(dict.fromkeys(clause))
+        if any(-literal in clause for literal in clause):
+            return
+        if not clause:
+            self.conflict = True
+        elif len(clause) == 1:
+            value = self.value(clause[0])
+            if value is False:
+                self.conflict = True
+            elif value is None:
+                self.assign(clause[0], None)
+        else:
+            self.attach(clause)
+
+    def attach(self, clause):
+        """
+        Stores a clause and watches its first two literals.
+        Returns the index of the clause.
+        """
+        index = len(self.clauses)
+        self.clauses.append(clause)
+        self.watches.setdefault(clause[0], []).append(index)
+        self.watches.setdefault(clause[1], []).append(index)
+        return index
+
+    def value(self, literal):
+        """
+        Returns True or False if `literal` is assigned, or None otherwise.
+        """
+        value = self.values[abs(literal)]
+        if value is None or literal > 0:
+            return value
+        return not value
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = literal > 0
+        self.levels[variable] = len(self.trail_limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal implied by unit clauses.
+        Returns the index of a conflicting clause, or None.
+        """
+        while self.head < len(self.trail):
+            false_literal = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches.get(false_literal, [])
+            kept = []
+            for position, index in enumerate(watching):
+                clause = self.clauses[index]
+
+                # Make sure the false literal is the second watch
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+
+                # Clause is already satisfied by its other watch
+                if self.value(clause[0]) is True:
+                    kept.append(index)
+                    continue
+
+                # Look for a new literal to watch
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches.setdefault(clause[1], []).append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if self.value(clause[0]) is False:
+                        kept.extend(watching[position + 1:])
+                        self.watches[false_literal] = kept
+                        return index
+                    self.assign(clause[0], index)
+            self.watches[false_literal] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Derives a learned clause from a conflict, cutting at the first
+        unique implication point. Returns the clause, with the asserting
+        literal first, and the level to jump back to.
+        """
+        level = len(self.trail_limits)
+        learned = [None]
+        seen = set()
+        pending = 0
+        index = len(self.trail) - 1
+        clause = self.clauses[conflict]
+        literal = None
+        while True:
+            for other in clause:
+                if other == literal:
+                    continue
+                variable = abs(other)
+                if variable in seen or self.levels[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump(variable)
+                if self.levels[variable] == level:
+                    pending += 1
+                else:
+                    learned.append(other)
+
+            # Walk back along the trail to the next literal to resolve on
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reasons[abs(literal)]]
+
+        learned[0] = -literal
+        if len(learned) == 1:
+            return learned, 0
+
+        # Watch the literal assigned at the highest remaining level second
+        deepest = max(
+            range(1, len(learned)),
+            key=lambda k: self.levels[abs(learned[k])]
+        )
+        learned[1], learned[deepest] = learned[deepest], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def bump(self, variable):
+        """
+        Increases the activity of a variable involved in a conflict.
+        """
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.increment *= 1e-100
+            self.heap = [
+                (-self.activity[variable], variable)
+                for variable in range(1, self.count + 1)
+            ]
+            heapq.heapify(self.heap)
+        heapq.heappush(self.heap, (-self.activity[variable], variable))
+
+    def backtrack(self, level):
+        """
+        Undoes every assignment made above decision level `level`.
+        """
+        if len(self.trail_limits) <= level:
+            return
+        limit = self.trail_limits[level]
+        for literal in self.trail[limit:]:
+            variable = abs(literal)
+            self.phases[variable] = literal > 0
+            self.values[variable] = None
+            self.reasons[variable] = None
+            heapq.heappush(self.heap, (-self.activity[variable], variable))
+        del self.trail[limit:]
+        del self.trail_limits[level:]
+        self.head = limit
+
+    def decide(self):
+        """
+        Returns the unassigned variable with the highest activity,
+        or None if every variable is assigned.
+        """
+        while self.heap:
+            activity, variable = heapq.heappop(self.heap)
+            if (self.values[variable] is None
+                    and -activity == self.activity[variable]):
+                return variable
+        return None
+
+    def solve(self):
+        """
+        Returns a satisfying assignment as a list indexed by variable,
+        or None if the clauses are unsatisfiable.
+        """
+        if self.conflict or self.propagate() is not None:
+            return None
+
+        restarts = 0
+        conflicts = 0
+        limit = RESTART_INTERVAL * luby(restarts)
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+
+                # A conflict without decisions means unsatisfiable
+                if not self.trail_limits:
+                    return None
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.assign(learned[0], self.attach(learned))
+                self.increment /= ACTIVITY_DECAY
+                conflicts += 1
+                continue
+
+            # Restart once enough conflicts have been seen
+            if conflicts >= limit:
+                restarts += 1
+                conflicts = 0
+                limit = RESTART_INTERVAL * luby(restarts)
+                self.backtrack(0)
+                continue
+
+            variable = self.decide()
+            if variable is None:
+                return list(self.values)
+            self.trail_limits.append(len(self.trail))
+            self.assign(variable if self.phases[variable] else -variable, None)
+
+
+def luby(index):
+    """
+    Returns the `index`-th term (from zero) of the Luby sequence
+    1, 1, 2, 1, 1, 2, 4, 1, 1, 2, ...
+    """
+    size = 1
+    exponent = 0
+    while size < index + 1:
+        exponent += 1
+        size = 2 * size + 1
+    while size - 1 != index:
+        size = (size - 1) // 2
+        exponent -= 1
+        index %= size
+    return 2 ** exponent
+
+
+def to_cnf(sentence):
+    """
+    Converts a sentence to conjunctive normal form with the Tseitin
+    transformation. Returns the `CNF`, whose clauses are satisfiable
+    exactly when the sentence is.
+    """
+    cnf = CNF()
+    cnf.add(sentence)
+    return cnf
+
+
+def satisfiable(sentence):
+    """
+    Returns a model of `sentence`, as a dictionary from symbol names to
+    truth values, or None if the sentence is unsatisfiable.
+    """
+    cnf = to_cnf(sentence)
+    values = Solver(cnf.clauses, cnf.count).solve()
+    if values is None:
+        return None
+    return {name: values[variable] is True
+            for name, variable in cnf.variables.items()}
+
+
+def sat_check(knowledge, query):
+    """Checks if knowledge base entails query, using a SAT solver."""
+    return satisfiable(And(knowledge, Not(query))) is None
+
+
+def count_models(sentence):
+    """
+    Returns the number of assignments to the symbols of `sentence`
+    under which it is true.
+
+    The sentence is converted to CNF, whose auxiliary variables are each
+    fixed by the symbols, so counting the models of the clauses counts
+    the models of the sentence.
+    """
+    cnf = to_cnf(sentence)
+    clauses = [frozenset(clause) for clause in cnf.clauses]
+    return count_clauses(clauses, set(range(1, cnf.count + 1)), dict())
+
+
+def count_clauses(clauses, variables, cache):
+    """
+    Returns the number of assignments to `variables` satisfying every
+    clause in `clauses`, where each clause is a frozenset of literals over
+    those variables.
+
+    This is a DPLL-style model counter. After unit propagation, the
+    clauses are split into components that share no variables, which are
+    counted independently and multiplied together. Each component's count
+    is cached, as the same component often appears on many branches.
+    """
+    clauses, assigned = propagate_units(clauses)
+    if clauses is None:
+        return 0
+
+    # Variables left in no clause can take either value
+    used = set()
+    for clause in clauses:
+        used.update(abs(literal) for literal in clause)
+    result = 2 ** len(variables - used - assigned)
+
+    for component in split_components(clauses):
+        key = frozenset(component)
+        if key not in cache:
+
+            # Branch on the variable that occurs most often
+            occurrences = dict()
+            for clause in component:
+                for literal in clause:
+                    occurrences[abs(literal)] = (
+                        occurrences.get(abs(literal), 0) + 1
+                    )
+            variable = max(occurrences, key=occurrences.get)
+            remaining = set(occurrences) - {variable}
+            cache[key] = sum(
+                count_clauses(condition(component, literal), remaining, cache)
+                for literal in [variable, -variable]
+            )
+        result *= cache[key]
+        if result == 0:
+            return 0
+    return result
+
+
+def condition(clauses, literal):
+    """
+    Returns the clauses simplified by making `literal` true, or None if
+    a clause becomes empty.
+    """
+    conditioned = []
+    for clause in clauses:
+        if literal in clause:
+            continue
+        if -literal in clause:
+            clause = clause - {-literal}
+            if not clause:
+                return None
+        conditioned.append(clause)
+    return conditioned
+
+
+def propagate_units(clauses):
+    """
+    Repeatedly makes the literals of unit clauses true. Returns the
+    simplified clauses and the set of variables assigned, or
+    `(None, None)` if the clauses turn out to be unsatisfiable.
+    """
+    assigned = set()
+    while clauses is not None:
+        unit = next((clause for clause in clauses if len(clause) == 1), None)
+        if unit is None:
+            return clauses, assigned
+        literal = next(iter(unit))
+        assigned.add(abs(literal))
+        clauses = condition(clauses, literal)
+    return None, None
+
+
+def split_components(clauses):
+    """
+    Splits clauses into lists that share no variables.
+    """
+    parents = dict()
+
+    def find(variable):
+        while parents.setdefault(variable, variable) != variable:
+            parents[variable] = parents[parents[variable]]
+            variable = parents[variable]
+        return variable
+
+    for clause in clauses:
+        variables = [abs(literal) for literal in clause]
+        root = find(variables[0])
+        for variable in variables[1:]:
+            parents[find(variable)] = root
+
+    components = dict()
+    for clause in clauses:
+        root = find(abs(next(iter(clause))))
+        components.setdefault(root, []).append(clause)
+    return list(components.values())
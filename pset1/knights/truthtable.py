@@ -0,0 +1,148 @@
+import numpy as np
+
+from logic import And, Biconditional, Implication, Not, Or, Sentence, Symbol
+
+# Number of models packed into each word of a truth table column
+WORD_BITS = 64
+
+# Number of words of each column evaluated at once, bounding memory use
+CHUNK_WORDS = 1 << 16
+
+# Word with every bit set
+ALL_MODELS = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# Columns of the first symbols within a single word, where bit `b` is the
+# value of symbol `i` in model `b`
+WORD_PATTERNS = [
+    np.uint64(0xAAAAAAAAAAAAAAAA),
+    np.uint64(0xCCCCCCCCCCCCCCCC),
+    np.uint64(0xF0F0F0F0F0F0F0F0),
+    np.uint64(0xFF00FF00FF00FF00),
+    np.uint64(0xFFFF0000FFFF0000),
+    np.uint64(0xFFFFFFFF00000000)
+]
+
+
+def truth_table_check(knowledge, query, chunk_words=CHUNK_WORDS):
+    """
+    Checks if knowledge base entails query by evaluating both over every
+    model at once, as packed truth table columns.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    uses = subformula_uses([knowledge, query])
+    for start, stop, valid in chunks(len(symbols), chunk_words):
+        columns = symbol_columns(symbols, start, stop)
+        cache = dict()
+        remaining = dict(uses)
+        knowledge_table = evaluate(
+            knowledge, columns, stop - start, cache, remaining
+        )
+        query_table = evaluate(query, columns, stop - start, cache, remaining)
+        if np.any(knowledge_table & ~query_table & valid):
+            return False
+    return True
+
+
+def subformula_uses(sentences):
+    """
+    Returns a dictionary mapping each subformula of the list `sentences`
+    to the number of times its table is needed, when every repeated
+    subformula is evaluated only once.
+    """
+    uses = dict()
+    stack = list(sentences)
+    while stack:
+        sentence = stack.pop()
+        if sentence in uses:
+            uses[sentence] += 1
+        else:
+            uses[sentence] = 1
+            stack.extend(sentence.children())
+    return uses
+
+
+def chunks(count, chunk_words=CHUNK_WORDS):
+    """
+    Splits the 2^count models of `count` symbols into chunks of words.
+    Yields tuples `(start, stop, valid)` of the first and past-the-last
+    word of each chunk, and a mask of the bits that are real models.
+    """
+    if count < 6:
+        yield 0, 1, np.uint64((1 << (1 << count)) - 1)
+        return
+    words = 1 << (count - 6)
+    for start in range(0, words, chunk_words):
+        yield start, min(start + chunk_words, words), ALL_MODELS
+
+
+def symbol_columns(symbols, start, stop):
+    """
+    Returns a dictionary mapping each symbol name to its truth table
+    column over words `start` to `stop`. Model `m` assigns symbol `i`
+    the value of bit `i` of `m`.
+    """
+    columns = dict()
+    words = np.arange(start, stop, dtype=np.uint64)
+    for i, name in enumerate(symbols):
+        if i < 6:
+            columns[name] = np.full(stop - start, WORD_PATTERNS[i])
+        else:
+            bits = (words >> np.uint64(i - 6)) & np.uint64(1)
+            columns[name] = np.where(bits == 1, ALL_MODELS, np.uint64(0))
+    return columns
+
+
+def evaluate(sentence, columns, words, cache=None, uses=None):
+    """
+    Evaluates a sentence over every model in `columns` at once, where
+    each column is `words` words long. Returns the sentence's truth
+    table column, as an array of words.
+    Subformulas that appear more than once are evaluated once per cache.
+    If `uses` maps subformulas to the number of times their tables are
+    still needed, as from `subformula_uses`, only tables needed again
+    are cached, and each is dropped after its last use.
+    """
+    Sentence.validate(sentence)
+    if cache is None:
+        cache = dict()
+    if sentence in cache:
+        table = cache[sentence]
+        if uses is not None:
+            uses[sentence] -= 1
+            if uses[sentence] == 0:
+                del cache[sentence]
+        return table
+
+    if isinstance(sentence, Symbol):
+        try:
+            table = columns[sentence.name]
+        except KeyError:
+            raise Exception(f"variable {sentence.name} not in model")
+    elif isinstance(sentence, Not):
+        table = ~evaluate(sentence.operand, columns, words, cache, uses)
+    elif isinstance(sentence, And):
+        table = np.full(words, ALL_MODELS)
+        for conjunct in sentence.conjuncts:
+            table &= evaluate(conjunct, columns, words, cache, uses)
+    elif isinstance(sentence, Or):
+        table = np.zeros(words, np.uint64)
+        for disjunct in sentence.disjuncts:
+            table |= evaluate(disjunct, columns, words, cache, uses)
+    elif isinstance(sentence, Implication):
+        table = ~evaluate(sentence.antecedent, columns, words, cache, uses)
+        table |= evaluate(sentence.consequent, columns, words, cache, uses)
+    elif isinstance(sentence, Biconditional):
+        table = (evaluate(sentence.left, columns, words, cache, uses)
+                 ^ evaluate(sentence.right, columns, words, cache, uses))
+        np.invert(table, out=table)
+    else:
+        raise TypeError(f"cannot evaluate {type(sentence).__name__}")
+
+    # Keep the table only if it is needed again
+    if uses is None:
+        cache[sentence] = table
+    else:
+        uses[sentence] = uses.get(sentence, 1) - 1
+        if uses[sentence] > 0:
+            cache[sentence] = table
+    return table
@@ -0,0 +1,70 @@
+import random
+import sys
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+# Board sizes to benchmark, as (height, width, mines)
+BOARDS = [
+    (8, 8, 8),
+    (16, 30, 99),
+    (100, 100, 1500),
+    (1000, 1000, 50000)
+]
+
+# Maximum number of moves played on each board
+MOVES = 2000
+
+
+def main():
+    if len(sys.argv) not in [1, 2]:
+        sys.exit("Usage: python benchmark.py [moves]")
+    moves = int(sys.argv[1]) if len(sys.argv) == 2 else MOVES
+
+    random.seed(0)
+    print(f"{'board':>16} {'setup':>9} {'moves':>7} {'per move':>10} {'kb':>7}")
+    for height, width, mines in BOARDS:
+        setup, played, elapsed, knowledge = benchmark(
+            height, width, mines, moves
+        )
+        board = f"{height}x{width}/{mines}"
+        per_move = elapsed / played * 1000 if played else 0
+        print(f"{board:>16} {setup:>8.3f}s {played:>7} "
+              f"{per_move:>8.3f}ms {knowledge:>7}")
+
+
+def benchmark(height, width, mines, moves):
+    """
+    Play up to `moves` moves of the AI on a new board and time them.
+
+    When a random move hits a mine, the AI is told about the mine and
+    play continues, so every board is measured for the same number of
+    moves. Returns a tuple of the setup time, the number of moves played,
+    the time spent playing them, and the final knowledge base size.
+    """
+    start = time.perf_counter()
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width)
+    setup = time.perf_counter() - start
+
+    played = 0
+    start = time.perf_counter()
+    while played < moves:
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+            if move is None:
+                break
+        if game.is_mine(move):
+            ai.mark_mine(move)
+            ai.update_knowledge()
+        else:
+            ai.add_knowledge(move, game.nearby_mines(move))
+        played += 1
+    elapsed = time.perf_counter() - start
+
+    return setup, played, elapsed, len(ai.knowledge)
+
+
+if __name__ == "__main__":
+    main()
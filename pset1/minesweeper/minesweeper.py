@@ -1,7 +1,23 @@
-import copy
+import array
+import collections
 import itertools
+import math
 import random
 
+import numpy as np
+
+# Largest number of cell classes enumerated exactly in one frontier component
+MAX_COMPONENT_CLASSES = 48
+
+# Largest number of component solutions kept in the memoization cache
+MAX_CACHED_COMPONENTS = 10000
+
+# Inference backends available to the AI
+INFERENCE = ["subset", "linear"]
+
+# Tolerance for treating floating point values as equal during elimination
+EPSILON = 1e-9
+
 
 class Minesweeper():
     """
@@ -10,26 +26,22 @@ class Minesweeper():
 
     def __init__(self, height=8, width=8, mines=8):
 
+        # Check that the requested mines fit on the board
+        if not 0 <= mines <= height * width:
+            raise ValueError("number of mines must fit on the board")
+
         # Set initial width, height, and number of mines
         self.height = height
         self.width = width
-        self.mines = set()
 
-        # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
+        # Add mines randomly, choosing all positions at once
+        self.board = np.zeros((height, width), dtype=bool)
+        positions = random.sample(range(height * width), mines)
+        self.board.flat[positions] = True
+        self.mines = set(divmod(position, width) for position in positions)
 
-        # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
+        # Count nearby mines for every cell up front
+        self.counts = neighbor_counts(self.board)
 
         # At first, player has found no mines
         self.mines_found = set()
@@ -42,7 +54,7 @@ class Minesweeper():
         for i in range(self.height):
             print("--" * self.width + "-")
             for j in range(self.width):
-                if self.board[i][j]:
+                if self.board[i, j]:
                     print("|X", end="")
                 else:
                     print("| ", end="")
@@ -51,7 +63,7 @@ class Minesweeper():
 
     def is_mine(self, cell):
         i, j = cell
-        return self.board[i][j]
+        return bool(self.board[i, j])
 
     def nearby_mines(self, cell):
         """
@@ -59,24 +71,35 @@ class Minesweeper():
         within one row and column of a given cell,
         not including the cell itself.
         """
+        i, j = cell
+        return int(self.counts[i, j])
 
-        # Keep count of nearby mines
-        count = 0
-
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
-
-        return count
+    def reveal(self, cell):
+        """
+        Returns a list of the cells revealed by clicking on a safe `cell`.
+        If the cell has no nearby mines, its neighbors are revealed too,
+        flooding out through every connected cell with no nearby mines.
+        """
+        # A cell with nearby mines reveals only itself
+        if self.counts[cell[0], cell[1]]:
+            return [cell]
+
+        # Flood out from the cell, so the work grows with the region
+        # revealed rather than with the size of the board
+        visited = {cell}
+        revealed = [cell]
+        queue = collections.deque([cell])
+        while queue:
+            i, j = queue.popleft()
+            if self.counts[i, j]:
+                continue
+            for m in range(max(i - 1, 0), min(i + 2, self.height)):
+                for n in range(max(j - 1, 0), min(j + 2, self.width)):
+                    if (m, n) not in visited:
+                        visited.add((m, n))
+                        revealed.append((m, n))
+                        queue.append((m, n))
+        return revealed
 
     def won(self):
         """
@@ -85,6 +108,22 @@ class Minesweeper():
         return self.mines_found == self.mines
 
 
+def neighbor_counts(board):
+    """
+    Returns a grid with the number of mines around each cell of `board`,
+    computed as a 2D convolution of the board with a 3x3 kernel of ones
+    whose centre is left out.
+    """
+    height, width = board.shape
+    padded = np.pad(board.astype(np.uint8), 1)
+    counts = np.zeros((height, width), dtype=np.uint8)
+    for di in range(3):
+        for dj in range(3):
+            if (di, dj) != (1, 1):
+                counts += padded[di:di + height, dj:dj + width]
+    return counts
+
+
 class Sentence():
     """
     Logical statement about a Minesweeper game
@@ -136,44 +175,275 @@ class Sentence():
             self.cells.remove(cell)
 
 
+class CellSet():
+    """
+    Set of board cells stored as a bitset with one byte per cell.
+    The bitset can also be viewed as a NumPy boolean grid, so that
+    whole-board queries are vectorized.
+    """
+
+    def __init__(self, height, width):
+        self.height = height
+        self.width = width
+        self.bits = bytearray(height * width)
+        self.size = 0
+
+    def __contains__(self, cell):
+        i, j = cell
+        if 0 <= i < self.height and 0 <= j < self.width:
+            return self.bits[i * self.width + j] == 1
+        return False
+
+    def __iter__(self):
+        for index in np.flatnonzero(self.grid()):
+            yield divmod(int(index), self.width)
+
+    def __len__(self):
+        return self.size
+
+    def __eq__(self, other):
+        if isinstance(other, CellSet):
+            return self.bits == other.bits
+        return set(self) == other
+
+    def __str__(self):
+        return str(set(self))
+
+    def add(self, cell):
+        """
+        Adds a cell to the set.
+        Returns True if the cell was not already in the set.
+        """
+        i, j = cell
+        index = i * self.width + j
+        if self.bits[index]:
+            return False
+        self.bits[index] = 1
+        self.size += 1
+        return True
+
+    def copy(self):
+        """
+        Returns the cells as a regular Python set.
+        """
+        return set(self)
+
+    def grid(self):
+        """
+        Returns a NumPy boolean grid sharing memory with the bitset.
+        """
+        grid = np.frombuffer(self.bits, dtype=bool)
+        grid.flags.writeable = False
+        return grid.reshape(self.height, self.width)
+
+
+class CellIndex():
+    """
+    Set of board cells supporting constant time insertion, removal and
+    random choice. Cells are packed densely into one array, and a second
+    array records where each cell sits in the first, so a cell is removed
+    by moving the last packed cell into its place.
+    """
+
+    def __init__(self, height, width, full=False):
+        self.height = height
+        self.width = width
+        if full:
+            self.items = array.array("i", range(height * width))
+            self.positions = array.array("i", range(height * width))
+        else:
+            self.items = array.array("i")
+            self.positions = array.array("i", [-1]) * (height * width)
+
+    def __contains__(self, cell):
+        i, j = cell
+        if 0 <= i < self.height and 0 <= j < self.width:
+            return self.positions[i * self.width + j] >= 0
+        return False
+
+    def __iter__(self):
+        for index in self.items:
+            yield divmod(index, self.width)
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, cell):
+        """
+        Adds a cell to the set, if not already present.
+        """
+        i, j = cell
+        index = i * self.width + j
+        if self.positions[index] < 0:
+            self.positions[index] = len(self.items)
+            self.items.append(index)
+
+    def discard(self, cell):
+        """
+        Removes a cell from the set, if present.
+        """
+        i, j = cell
+        index = i * self.width + j
+        position = self.positions[index]
+        if position < 0:
+            return
+        last = self.items.pop()
+        if last != index:
+            self.items[position] = last
+            self.positions[last] = position
+        self.positions[index] = -1
+
+    def last(self):
+        """
+        Returns the most recently packed cell.
+        """
+        return divmod(self.items[-1], self.width)
+
+    def choice(self):
+        """
+        Returns a cell chosen uniformly at random.
+        """
+        return divmod(self.items[random.randrange(len(self.items))],
+                      self.width)
+
+
 class MinesweeperAI():
     """
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mines=None, inference="subset"):
+
+        # Check that the inference backend exists
+        if inference not in INFERENCE:
+            raise ValueError(f"inference must be one of {INFERENCE}")
+        self.inference = inference
 
         # Set initial height and width
         self.height = height
         self.width = width
 
+        # Total number of mines on the board, if known
+        self.total_mines = mines
+
         # Keep track of which cells have been clicked on
-        self.moves_made = set()
+        self.moves_made = CellSet(height, width)
 
         # Keep track of cells known to be safe or mines
-        self.mines = set()
-        self.safes = set()
+        self.mines = CellSet(height, width)
+        self.safes = CellSet(height, width)
+
+        # Keep track of safe cells not yet chosen, and of cells not yet
+        # known to be safe or mines, so moves are found in constant time
+        self.safe_moves = CellIndex(height, width)
+        self.unknown = CellIndex(height, width, full=True)
 
         # List of sentences about the game known to be true
         self.knowledge = []
 
+        # Map each sentence's identity to its position in self.knowledge,
+        # so sentences are removed in constant time
+        self._positions = dict()
+
+        # Map each cell to the sentences that mention it
+        self.cell_sentences = dict()
+
+        # Sentences that changed and must be checked for new inferences
+        self.pending = collections.deque()
+
+        # Sentences awaiting elimination, when using linear inference
+        self.dirty = dict()
+
+        # Memoized solution counts of frontier components
+        self.solution_cache = dict()
+
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
-        self.mines.add(cell)
-        for sentence in self.knowledge:
+        if not self.mines.add(cell):
+            return
+        self.unknown.discard(cell)
+        for sentence in self.cell_sentences.pop(cell, dict()).values():
             sentence.mark_mine(cell)
+            self.pending.append(sentence)
 
     def mark_safe(self, cell):
         """
         Marks a cell as safe, and updates all knowledge
         to mark that cell as safe as well.
         """
-        self.safes.add(cell)
-        for sentence in self.knowledge:
+        if not self.safes.add(cell):
+            return
+        self.unknown.discard(cell)
+        if cell not in self.moves_made:
+            self.safe_moves.add(cell)
+        for sentence in self.cell_sentences.pop(cell, dict()).values():
             sentence.mark_safe(cell)
+            self.pending.append(sentence)
+
+    def neighbors(self, cell):
+        """
+        Returns the cells within one row and column of `cell`
+        that lie on the board, not including the cell itself.
+        """
+        i, j = cell
+        return [
+            (m, n)
+            for m in range(max(i - 1, 0), min(i + 2, self.height))
+            for n in range(max(j - 1, 0), min(j + 2, self.width))
+            if (m, n) != cell
+        ]
+
+    def add_sentence(self, sentence):
+        """
+        Adds a sentence to the knowledge base and queues it for inference.
+        """
+        if not sentence.cells:
+            return
+        self._positions[id(sentence)] = len(self.knowledge)
+        self.knowledge.append(sentence)
+        for cell in sentence.cells:
+            self.cell_sentences.setdefault(cell, dict())[id(sentence)] = sentence
+        self.pending.append(sentence)
+
+    def remove_sentence(self, sentence):
+        """
+        Removes a sentence from the knowledge base.
+        """
+        position = self._positions.pop(id(sentence), None)
+        if position is None:
+            return
+
+        # Move the last sentence into the freed position
+        last = self.knowledge.pop()
+        if last is not sentence:
+            self.knowledge[position] = last
+            self._positions[id(last)] = position
+        for cell in sentence.cells:
+            sentences = self.cell_sentences.get(cell)
+            if sentences is not None:
+                sentences.pop(id(sentence), None)
+                if not sentences:
+                    del self.cell_sentences[cell]
+
+    def contains(self, sentence):
+        """
+        Returns True if this very sentence object is in the knowledge base.
+        """
+        position = self._positions.get(id(sentence))
+        return position is not None and self.knowledge[position] is sentence
+
+    def overlapping_sentences(self, sentence):
+        """
+        Returns the other sentences sharing at least one cell with `sentence`.
+        """
+        overlapping = dict()
+        for cell in sentence.cells:
+            overlapping.update(self.cell_sentences.get(cell, dict()))
+        overlapping.pop(id(sentence), None)
+        return list(overlapping.values())
 
     def add_knowledge(self, cell, count):
         """
@@ -192,77 +462,138 @@ class MinesweeperAI():
         """
         # Mark the cell as a move that has been made
         self.moves_made.add(cell)
+        self.safe_moves.discard(cell)
 
         # Mark the cell as safe
         self.mark_safe(cell)
 
         # Create new sentence with cell's undetermined neighbors
-        i = cell[0]
-        j = cell[1]
-        count_copy = count
         neighbor_cells = set()
-        for m in range((i - 1), (i + 2)):
-            for n in range((j - 1), (j + 2)):
-                if m in range(0, 8) and n in range(0, 8):
-                    if (m, n) not in self.safes and (m, n) not in self.mines:
-                        neighbor_cells.add((m, n))
-                    elif (m, n) in self.mines:
-                        count_copy -= 1
-        sentence = Sentence(neighbor_cells, count_copy)
+        for neighbor in self.neighbors(cell):
+            if neighbor in self.mines:
+                count -= 1
+            elif neighbor not in self.safes:
+                neighbor_cells.add(neighbor)
 
         # Add created sentence to knowledge database
-        self.knowledge.append(sentence)
+        self.add_sentence(Sentence(neighbor_cells, count))
 
         # Update knowledge database
-        sentences_to_append = []
-        sentences_to_remove = []
-        changes = True
-        while changes:
-            # If any change is done, change becomes True again
-            changes = False
-
-            # Check for subsets
-            for sentence_1 in self.knowledge:
-                for sentence_2 in self.knowledge:
-                    if sentence_1.cells != sentence_2.cells and sentence_2.cells.issubset(sentence_1.cells) and sentence_2 is not None:
-                        changes = True
-                        new_set = sentence_1.cells - sentence_2.cells
-                        new_count = sentence_1.count - sentence_2.count
-                        new_sentence = Sentence(new_set, new_count)
-                        sentences_to_append.append(new_sentence)
-                        sentences_to_remove.append(sentence_1)
-
-            # Check for new safe places or new mines
-            for sentence in self.knowledge:
-                if sentence.known_mines() is not None:
-                    changes = True
-                    s_copy = copy.deepcopy(sentence)
-                    while not len(s_copy.cells) == 0:
-                        cell = s_copy.cells.pop()
+        self.update_knowledge()
+
+    def update_knowledge(self):
+        """
+        Draws inferences from every pending sentence until no sentence
+        changes. Only sentences sharing cells with a changed sentence are
+        revisited, so the work is proportional to the affected region of
+        the board rather than to the size of the knowledge base.
+        """
+        while True:
+            while self.pending:
+                sentence = self.pending.popleft()
+
+                # Skip sentences that were removed after being queued
+                if not self.contains(sentence):
+                    continue
+
+                # Drop sentences with no undetermined cells left
+                if not sentence.cells:
+                    self.remove_sentence(sentence)
+
+                # Check for new mines or new safe places
+                elif sentence.known_mines() is not None:
+                    self.remove_sentence(sentence)
+                    for cell in list(sentence.cells):
                         self.mark_mine(cell)
-                    sentences_to_remove.append(sentence)
                 elif sentence.known_safes() is not None:
-                    changes = True
-                    s_copy = copy.deepcopy(sentence)
-                    while not len(s_copy.cells) == 0:
-                        cell = s_copy.cells.pop()
+                    self.remove_sentence(sentence)
+                    for cell in list(sentence.cells):
                         self.mark_safe(cell)
-                    sentences_to_remove.append(sentence)
-
-            # Remove unnecessary sentences
-            for sentence in sentences_to_remove:
-                # Sentences_to_remove is a list, so may contain the same sentence twice
-                # As knowledge is a set, it has no duplicates, so the sentence is only removed once
-                try:
-                    self.knowledge.remove(sentence)
-                except:
-                    pass
-            sentences_to_remove = []
-
-            # Add subsets to KB
-            for sentence in sentences_to_append:
-                self.knowledge.append(sentence)
-            sentences_to_append = []
+
+                # Check for subsets, and queue the sentence for elimination
+                else:
+                    if self.inference == "linear":
+                        self.dirty[id(sentence)] = sentence
+                    self.infer_subsets(sentence)
+
+            # Eliminate over the components touched by changed sentences
+            if not self.dirty:
+                break
+            self.infer_linear()
+
+    def infer_subsets(self, sentence):
+        """
+        Applies the subset rule between `sentence` and every sentence
+        sharing a cell with it: if one sentence's cells are a subset of
+        another's, the larger sentence is replaced by their difference.
+        """
+        for other in self.overlapping_sentences(sentence):
+            if other.cells == sentence.cells:
+                self.remove_sentence(other)
+            elif other.cells < sentence.cells:
+                self.remove_sentence(sentence)
+                self.add_sentence(Sentence(
+                    sentence.cells - other.cells,
+                    sentence.count - other.count
+                ))
+                return
+            elif sentence.cells < other.cells:
+                self.remove_sentence(other)
+                self.add_sentence(Sentence(
+                    other.cells - sentence.cells,
+                    other.count - sentence.count
+                ))
+
+    def infer_linear(self):
+        """
+        Runs Gaussian elimination over every component containing a
+        sentence in self.dirty, and marks the mines and safes it proves.
+
+        Each component becomes a 0/1 matrix with one row per sentence and
+        one column per cell. After reducing it to row echelon form, a row
+        whose value equals the largest (or smallest) sum its coefficients
+        allow forces every cell with a nonzero coefficient in that row.
+        """
+        cells = [
+            cell
+            for sentence in self.dirty.values()
+            if self.contains(sentence)
+            for cell in sentence.cells
+        ]
+        self.dirty.clear()
+
+        mines = []
+        safes = []
+        for cells, sentences in self.components(cells):
+            columns = {cell: index for index, cell in enumerate(cells)}
+            matrix = np.zeros((len(sentences), len(cells) + 1))
+            for row, sentence in enumerate(sentences):
+                matrix[row, [columns[cell] for cell in sentence.cells]] = 1
+                matrix[row, -1] = sentence.count
+            matrix = row_echelon(matrix)
+
+            # Compare each row's value with the bounds of its coefficients
+            coefficients = matrix[:, :-1]
+            values = matrix[:, -1]
+            positive = coefficients > EPSILON
+            negative = coefficients < -EPSILON
+            upper = np.where(positive, coefficients, 0).sum(axis=1)
+            lower = np.where(negative, coefficients, 0).sum(axis=1)
+            at_upper = np.abs(values - upper) < EPSILON
+            at_lower = np.abs(values - lower) < EPSILON
+            forced_mines = (positive & at_upper[:, None]) | (
+                negative & at_lower[:, None]
+            )
+            forced_safes = (negative & at_upper[:, None]) | (
+                positive & at_lower[:, None]
+            )
+            mines.extend(cells[i] for i in np.flatnonzero(forced_mines.any(0)))
+            safes.extend(cells[i] for i in np.flatnonzero(forced_safes.any(0)))
+
+        for cell in mines:
+            self.mark_mine(cell)
+        for cell in safes:
+            self.mark_safe(cell)
 
     def make_safe_move(self):
         """
@@ -273,9 +604,8 @@ class MinesweeperAI():
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        for cell in self.safes:
-            if cell not in self.moves_made:
-                return cell
+        if not len(self.safe_moves) == 0:
+            return self.safe_moves.last()
         return None
 
     def make_random_move(self):
@@ -285,12 +615,327 @@ class MinesweeperAI():
             1) have not already been chosen, and
             2) are not known to be mines
         """
-        possibilities = []
-        for i in range(self.height):
-            for j in range(self.width):
-                cell = (i, j)
-                if cell not in self.moves_made and cell not in self.mines:
-                    possibilities.append(cell)
-        if not len(possibilities) == 0:
-            return random.choice(possibilities)
+        possibilities = len(self.unknown) + len(self.safe_moves)
+        if not possibilities == 0:
+            if random.randrange(possibilities) < len(self.unknown):
+                return self.unknown.choice()
+            return self.safe_moves.choice()
         return None
+
+    def make_guess_move(self):
+        """
+        Returns the move least likely to be a mine among cells that:
+            1) have not already been chosen, and
+            2) are not known to be mines
+        Ties are broken randomly. Returns None if no such cell exists.
+        """
+        safe = self.make_safe_move()
+        if safe is not None:
+            return safe
+        frontier, interior = self.mine_probabilities()
+
+        # Choose an unconstrained cell if none on the frontier is safer
+        best = min(frontier.values(), default=None)
+        if len(self.unknown) > len(frontier) and (
+            best is None or interior <= best + 1e-9
+        ):
+            return self.interior_choice(frontier)
+        if best is None:
+            return None
+        return random.choice([
+            cell for cell, probability in frontier.items()
+            if probability <= best + 1e-9
+        ])
+
+    def interior_choice(self, frontier):
+        """
+        Returns a random undetermined cell that is not in `frontier`.
+        Cells are drawn until one falls outside the frontier, which takes
+        a few draws unless the frontier covers most undetermined cells,
+        in which case the remaining cells are listed instead.
+        """
+        for attempt in range(32):
+            cell = self.unknown.choice()
+            if cell not in frontier:
+                return cell
+        return random.choice([
+            cell for cell in self.unknown if cell not in frontier
+        ])
+
+    def mine_probabilities(self):
+        """
+        Returns a tuple `(frontier, interior)`, where `frontier` maps each
+        cell mentioned in the knowledge base to its probability of being a
+        mine, and `interior` is the probability that any other undetermined
+        cell is a mine.
+
+        The frontier is split into independent components of sentences
+        that share cells. Each component's solutions are counted separately,
+        and the components are then combined with the number of mines left
+        on the board, when it is known.
+        """
+        remaining = None
+        if self.total_mines is not None:
+            remaining = self.total_mines - len(self.mines)
+        unknown = len(self.unknown)
+
+        # Count solutions of each component, by number of mines used,
+        # scaled to sum to one so that large boards do not overflow
+        exact = []
+        frontier = dict()
+        for cells, sentences in self.components():
+            solutions = self.component_solutions(sentences)
+            if solutions is None:
+                frontier.update(self.estimate_probabilities(cells))
+                continue
+            classes, ways, mines = solutions
+            total = sum(ways.values())
+            exact.append((
+                classes,
+                {k: count / total for k, count in ways.items()},
+                {k: [count / total for count in mines[k]] for k in mines}
+            ))
+        outside = unknown - len(frontier) - sum(
+            len(cells) for classes, ways, mines in exact for cells in classes
+        )
+
+        # Weight each total number of frontier mines by the ways of placing
+        # the remaining mines among the cells outside the frontier
+        def weight(k):
+            if remaining is None:
+                return 0.0
+            if not 0 <= remaining - k <= outside:
+                return -math.inf
+            return log_binomial(outside, remaining - k)
+
+        # Combine components, leaving each one out in turn
+        distributions = [ways for classes, ways, mines in exact]
+        prefixes = [{0: 1.0}]
+        for distribution in distributions:
+            prefixes.append(convolve(prefixes[-1], distribution, remaining))
+        suffixes = [{0: 1.0}]
+        for distribution in reversed(distributions):
+            suffixes.append(convolve(suffixes[-1], distribution, remaining))
+        suffixes.reverse()
+        total = prefixes[-1]
+        scale = max(
+            (weight(k) for k, ways in total.items() if ways > 0),
+            default=-math.inf
+        )
+        if scale == -math.inf:
+            scale = 0.0
+        normalizer = sum(
+            ways * math.exp(weight(k) - scale) for k, ways in total.items()
+        )
+        for index, (classes, ways, mines) in enumerate(exact):
+            others = convolve(prefixes[index], suffixes[index + 1], remaining)
+            factors = dict()
+            for k in ways:
+                factors[k] = sum(
+                    count * math.exp(weight(k + j) - scale)
+                    for j, count in others.items()
+                )
+            for i, cells in enumerate(classes):
+                expected = sum(
+                    mines[k][i] * factors[k] for k in ways
+                ) / normalizer if normalizer else 0.0
+                for cell in cells:
+                    frontier[cell] = expected / len(cells)
+
+        # Estimate the probability of cells outside the frontier
+        if outside <= 0:
+            interior = 1.0
+        elif remaining is None:
+            interior = (sum(frontier.values()) / len(frontier)
+                        if frontier else 0.0)
+        else:
+            interior = sum(
+                ways * math.exp(weight(k) - scale) * (remaining - k)
+                for k, ways in total.items()
+            ) / normalizer / outside if normalizer else 0.0
+        return frontier, interior
+
+    def components(self, cells=None):
+        """
+        Splits the knowledge base into independent components.
+        Returns a list of `(cells, sentences)` pairs, where no two
+        components share a cell. If `cells` is given, only the components
+        containing those cells are returned.
+        """
+        components = []
+        visited = set()
+        for start in self.cell_sentences if cells is None else cells:
+            if start in visited or start not in self.cell_sentences:
+                continue
+            visited.add(start)
+            cells = [start]
+            sentences = dict()
+            queue = [start]
+            while queue:
+                cell = queue.pop()
+                for key, sentence in self.cell_sentences[cell].items():
+                    if key in sentences:
+                        continue
+                    sentences[key] = sentence
+                    for neighbor in sentence.cells:
+                        if neighbor not in visited:
+                            visited.add(neighbor)
+                            cells.append(neighbor)
+                            queue.append(neighbor)
+            components.append((cells, list(sentences.values())))
+        return components
+
+    def component_solutions(self, sentences):
+        """
+        Counts the mine placements in one component consistent with all of
+        its sentences. Cells that appear in exactly the same sentences are
+        interchangeable, so they are grouped into classes and only the
+        number of mines in each class is enumerated.
+
+        Returns a tuple `(classes, ways, mines)`, where `classes` lists the
+        cells of each class, `ways[k]` is the number of placements using `k`
+        mines, and `mines[k][i]` is the total number of mines in class `i`
+        summed over those placements. Returns None if the component has
+        more than MAX_COMPONENT_CLASSES classes. Results are memoized.
+        """
+        key = frozenset(
+            (frozenset(sentence.cells), sentence.count)
+            for sentence in sentences
+        )
+        if key in self.solution_cache:
+            return self.solution_cache[key]
+
+        # Group cells by the set of sentences they appear in
+        constraints = [(cells, count) for cells, count in key]
+        signatures = dict()
+        for index, (cells, count) in enumerate(constraints):
+            for cell in cells:
+                signatures.setdefault(cell, []).append(index)
+        groups = dict()
+        for cell, signature in signatures.items():
+            groups.setdefault(tuple(signature), []).append(cell)
+        if len(groups) > MAX_COMPONENT_CLASSES:
+            return None
+
+        # Assign classes in order of their first sentence, so that
+        # sentences are completed, and checked, as early as possible
+        order = sorted(groups, key=lambda signature: signature[0])
+        classes = [groups[signature] for signature in order]
+        members = [list(signature) for signature in order]
+        needed = [count for cells, count in constraints]
+        capacity = [len(cells) for cells, count in constraints]
+
+        ways = collections.Counter()
+        mines = collections.defaultdict(lambda: [0] * len(classes))
+        assignment = [0] * len(classes)
+
+        def search(index, placements, used):
+
+            # Every sentence is satisfied once all classes are assigned
+            if index == len(classes):
+                ways[used] += placements
+                for i, count in enumerate(assignment):
+                    mines[used][i] += placements * count
+                return
+
+            size = len(classes[index])
+            for constraint in members[index]:
+                capacity[constraint] -= size
+            for count in range(size + 1):
+
+                # Check that every sentence of the class can still be met
+                if all(
+                    0 <= needed[constraint] - count <= capacity[constraint]
+                    for constraint in members[index]
+                ):
+                    for constraint in members[index]:
+                        needed[constraint] -= count
+                    assignment[index] = count
+                    search(index + 1,
+                           placements * binomial(size, count), used + count)
+                    for constraint in members[index]:
+                        needed[constraint] += count
+            for constraint in members[index]:
+                capacity[constraint] += size
+
+        search(0, 1, 0)
+        solutions = (classes, dict(ways), dict(mines))
+        if len(self.solution_cache) >= MAX_CACHED_COMPONENTS:
+            self.solution_cache.clear()
+        self.solution_cache[key] = solutions
+        return solutions
+
+    def estimate_probabilities(self, cells):
+        """
+        Returns a rough mine probability for each cell of a component too
+        large to enumerate: the mean mine density of its sentences.
+        """
+        probabilities = dict()
+        for cell in cells:
+            densities = [
+                sentence.count / len(sentence.cells)
+                for sentence in self.cell_sentences[cell].values()
+            ]
+            probabilities[cell] = sum(densities) / len(densities)
+        return probabilities
+
+
+def row_echelon(matrix):
+    """
+    Reduces an augmented matrix to reduced row echelon form using
+    Gaussian elimination with partial pivoting, and returns it.
+    """
+    matrix = matrix.copy()
+    rows, columns = matrix.shape
+    row = 0
+    for column in range(columns - 1):
+        if row == rows:
+            break
+
+        # Pick the row with the largest coefficient as the pivot
+        pivot = row + int(np.argmax(np.abs(matrix[row:, column])))
+        if abs(matrix[pivot, column]) < EPSILON:
+            continue
+        matrix[[row, pivot]] = matrix[[pivot, row]]
+        matrix[row] /= matrix[row, column]
+
+        # Eliminate the column from every other row at once
+        factors = matrix[:, column].copy()
+        factors[row] = 0
+        matrix -= np.outer(factors, matrix[row])
+        row += 1
+
+    # Clean up rounding noise around zero
+    matrix[np.abs(matrix) < EPSILON] = 0
+    return matrix
+
+
+def binomial(n, k):
+    """
+    Returns the number of ways to choose `k` items out of `n`.
+    """
+    if not 0 <= k <= n:
+        return 0
+    return math.factorial(n) // (math.factorial(k) * math.factorial(n - k))
+
+
+def log_binomial(n, k):
+    """
+    Returns the natural logarithm of the number of ways to choose
+    `k` items out of `n`, for counts too large to compute exactly.
+    """
+    return math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1)
+
+
+def convolve(first, second, limit=None):
+    """
+    Combines two independent distributions of mine counts, each mapping
+    a number of mines to its weight, into a single distribution.
+    Counts above `limit` are dropped, if a limit is given.
+    """
+    combined = collections.defaultdict(float)
+    for i, a in first.items():
+        for j, b in second.items():
+            if limit is None or i + j <= limit:
+                combined[i + j] += a * b
+    return dict(combined)
@@ -0,0 +1,187 @@
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+import time
+
+import numpy as np
+
+from minesweeper import INFERENCE, Minesweeper, MinesweeperAI
+
+# Ways for the AI to pick a move when no safe move is known
+STRATEGIES = ["guess", "random"]
+
+# Number of points kept when summarizing knowledge base size over a game
+CURVE_POINTS = 10
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play seeded Minesweeper games against the AI headlessly."
+    )
+    parser.add_argument("-n", "--games", type=int, default=100)
+    parser.add_argument("--height", type=int, default=8)
+    parser.add_argument("--width", type=int, default=8)
+    parser.add_argument("--mines", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the first game; games use consecutive seeds")
+    parser.add_argument("--inference", choices=INFERENCE, default="subset")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="guess")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--record", metavar="FILE",
+                        help="save the configuration, seeds and outcomes")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="replay a recording and check the outcomes match")
+    args = parser.parse_args()
+
+    # Load the games to play from a recording, or create new seeds
+    if args.replay:
+        with open(args.replay) as f:
+            recording = json.load(f)
+        config = recording["config"]
+        seeds = [game["seed"] for game in recording["games"]]
+    else:
+        recording = None
+        config = {
+            "height": args.height,
+            "width": args.width,
+            "mines": args.mines,
+            "inference": args.inference,
+            "strategy": args.strategy
+        }
+        seeds = list(range(args.seed, args.seed + args.games))
+
+    results = simulate(seeds, processes=args.processes, **config)
+    report(results)
+
+    if args.record:
+        with open(args.record, "w") as f:
+            json.dump({"config": config, "games": [
+                {"seed": result["seed"], "won": result["won"],
+                 "moves": result["moves"]}
+                for result in results
+            ]}, f, indent=2)
+
+    # Check that every replayed game ended the same way as recorded
+    if recording is not None:
+        mismatches = [
+            (expected, result)
+            for expected, result in zip(recording["games"], results)
+            if (expected["won"], expected["moves"])
+            != (result["won"], result["moves"])
+        ]
+        for expected, result in mismatches:
+            print(f"Seed {expected['seed']}: recorded won={expected['won']} "
+                  f"moves={expected['moves']}, replayed won={result['won']} "
+                  f"moves={result['moves']}")
+        if mismatches:
+            sys.exit(f"{len(mismatches)} of {len(results)} games differ")
+        print(f"All {len(results)} games match the recording")
+
+
+def simulate(seeds, height=8, width=8, mines=8, inference="subset",
+             strategy="guess", processes=None):
+    """
+    Play one game for each seed in `seeds` across a pool of processes.
+    Return a list of the results of `play`, in the same order as `seeds`.
+    """
+    games = [
+        (seed, height, width, mines, inference, strategy) for seed in seeds
+    ]
+    with multiprocessing.Pool(processes) as pool:
+        return pool.starmap(play, games)
+
+
+def play(seed, height, width, mines, inference="subset", strategy="guess"):
+    """
+    Play a full game with the given seed, without a user interface.
+
+    Return a dictionary with whether the game was won, the number of
+    moves made, the time spent in `add_knowledge`, the latency of every
+    move, and the size of the knowledge base after every move.
+    """
+    random.seed(seed)
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width, mines=mines,
+                       inference=inference)
+    guess = ai.make_guess_move if strategy == "guess" else ai.make_random_move
+
+    won = False
+    knowledge_time = 0
+    latencies = []
+    knowledge_sizes = []
+    while True:
+        start = time.perf_counter()
+
+        # Make a safe move if possible, otherwise guess
+        move = ai.make_safe_move()
+        if move is None:
+            move = guess()
+        if move is None or game.is_mine(move):
+            won = move is None
+            break
+
+        # Reveal the move and tell the AI about every revealed cell
+        for cell in game.reveal(move):
+            if cell not in ai.moves_made:
+                knowledge_start = time.perf_counter()
+                ai.add_knowledge(cell, game.nearby_mines(cell))
+                knowledge_time += time.perf_counter() - knowledge_start
+
+        latencies.append(time.perf_counter() - start)
+        knowledge_sizes.append(len(ai.knowledge))
+
+        # The game is won once every safe cell has been revealed
+        if len(ai.moves_made) == height * width - mines:
+            won = True
+            break
+
+    return {
+        "seed": seed,
+        "won": won,
+        "moves": len(latencies),
+        "knowledge_time": knowledge_time,
+        "latencies": latencies,
+        "knowledge_sizes": knowledge_sizes
+    }
+
+
+def report(results):
+    """
+    Print a summary of the results of many games.
+    """
+    games = len(results)
+    wins = sum(result["won"] for result in results)
+    moves = [result["moves"] for result in results]
+    latencies = np.concatenate(
+        [result["latencies"] for result in results] + [[]]
+    ) * 1000
+    knowledge_time = sum(result["knowledge_time"] for result in results)
+
+    print(f"Games: {games}")
+    print(f"Win rate: {wins / games:.1%} ({wins} won)")
+    print(f"Moves per game: mean {np.mean(moves):.1f}, max {max(moves)}")
+    print(f"Time in add_knowledge: {knowledge_time:.3f}s total, "
+          f"{knowledge_time / max(sum(moves), 1) * 1000:.3f}ms per move")
+    if len(latencies):
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+        print(f"Move latency: p50 {p50:.3f}ms, p90 {p90:.3f}ms, "
+              f"p99 {p99:.3f}ms, max {latencies.max():.3f}ms")
+
+    # Show mean knowledge base size at evenly spaced points of each game
+    curve = np.zeros(CURVE_POINTS)
+    counted = 0
+    for result in results:
+        sizes = result["knowledge_sizes"]
+        if sizes:
+            points = np.linspace(0, len(sizes) - 1, CURVE_POINTS)
+            curve += np.array(sizes)[points.round().astype(int)]
+            counted += 1
+    if counted:
+        sizes = ", ".join(f"{size:.1f}" for size in curve / counted)
+        print(f"Knowledge base size over a game: {sizes}")
+
+
+if __name__ == "__main__":
+    main()
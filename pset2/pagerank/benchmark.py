@@ -0,0 +1,107 @@
+import random
+import sys
+import time
+
+from pagerank import (
+    DAMPING, SAMPLES, apply_changes, iterate_pagerank, sample_pagerank,
+    sparse_pagerank, update_pagerank, vector_sample_pagerank
+)
+
+# Numbers of pages in the synthetic corpora
+SIZES = [1000, 10000, 100000]
+
+# Fraction of pages with no links, like leaf pages of a crawl
+DANGLING = 0.8
+
+# Largest number of links on a page with links
+MAX_LINKS = 10
+
+# Number of pages relinked before updating ranks, and the tolerances
+# the updates are timed at
+CHANGES = 10
+UPDATE_TOLERANCES = [1e-6, 1e-4]
+
+
+def main():
+    if len(sys.argv) not in [1, 2]:
+        sys.exit("Usage: python benchmark.py [dangling]")
+    dangling = float(sys.argv[1]) if len(sys.argv) == 2 else DANGLING
+
+    random.seed(0)
+    print(f"{'pages':>8} {'dangling':>9} {'links':>8} "
+          f"{'iterate':>9} {'sparse':>9} {'difference':>11} "
+          f"{'samples/s':>10} {'vector/s':>10}")
+    for size in SIZES:
+        corpus = synthetic(size, dangling)
+        links = sum(len(corpus[page]) for page in corpus)
+        leaves = sum(1 for page in corpus if not corpus[page])
+
+        iterated, iterate_time = timed(iterate_pagerank, corpus, DAMPING)
+        sparse, sparse_time = timed(sparse_pagerank, corpus, DAMPING)
+        difference = max(abs(iterated[page] - sparse[page]) for page in corpus)
+
+        # Measure the throughput of one surfer and of many at once
+        stats = dict()
+        sample_pagerank(corpus, DAMPING, SAMPLES * 10, stats)
+        vector_stats = dict()
+        vector_sample_pagerank(
+            corpus, DAMPING, SAMPLES * 1000, stats=vector_stats
+        )
+        print(f"{size:>8} {leaves:>9} {links:>8} {iterate_time:>8.3f}s "
+              f"{sparse_time:>8.3f}s {difference:>11.6f} "
+              f"{stats['samples_per_second']:>10.0f} "
+              f"{vector_stats['samples_per_second']:>10.0f}")
+
+    # Time updating the ranks of the largest corpus after a few changes
+    print(f"\nUpdating {SIZES[-1]} pages after relinking {CHANGES}")
+    print(f"{'tolerance':>10} {'recompute':>10} {'warm':>9} {'push':>9}")
+    pages = list(corpus)
+    changes = {
+        page: set(random.sample(pages, MAX_LINKS))
+        for page in random.sample(pages, CHANGES)
+    }
+    for tolerance in UPDATE_TOLERANCES:
+        ranks = sparse_pagerank(corpus, DAMPING, tolerance)
+        row = f"{tolerance:>10g}"
+        for method in ["recompute", "warm", "push"]:
+            changed = dict(corpus)
+            start = time.perf_counter()
+            if method == "recompute":
+                apply_changes(changed, changes)
+                sparse_pagerank(changed, DAMPING, tolerance)
+            else:
+                update_pagerank(
+                    changed, ranks, changes, DAMPING, method, tolerance
+                )
+            row += f" {time.perf_counter() - start:>9.3f}s"
+        print(row)
+
+
+def synthetic(size, dangling):
+    """
+    Return a corpus of `size` pages, where a `dangling` fraction of the
+    pages have no links and the others link to up to MAX_LINKS pages.
+    """
+    pages = [f"{i}.html" for i in range(size)]
+    corpus = dict()
+    for page in pages:
+        if random.random() < dangling:
+            corpus[page] = set()
+        else:
+            links = random.sample(pages, random.randint(1, MAX_LINKS))
+            corpus[page] = set(links) - {page}
+    return corpus
+
+
+def timed(function, *args):
+    """
+    Return the result of calling `function` with `args`, and the
+    number of seconds the call took.
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,71 @@
+import array
+import collections
 import copy
+import itertools
+import locale
+import math
+import mmap
+import multiprocessing
 import os
 import random
 import re
+import struct
 import sys
+import time
 
 DAMPING = 0.85
 SAMPLES = 10000
 
+# Name of the file caching the links of a corpus in its directory, the
+# tag its contents start with, and its header of the tag and counts
+CACHE = ".pagerank-cache"
+MAGIC = b"PRLINKS1"
+HEADER = struct.Struct("<8sQQQ")
+
+# Files modified less than this many nanoseconds before being cached are
+# parsed again next time, as they may change within the same timestamp
+RACY_NS = 2 * 10 ** 9
+
+# Links in the raw bytes of an HTML page, as matched by `crawl`
+LINK = re.compile(rb"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
+# Number of files each worker of the parallel crawler parses at a time
+CRAWL_CHUNK = 64
+
+# Smallest file the parallel crawler maps into memory instead of reading
+MMAP_SIZE = 1 << 20
+
+# In worker processes, the directory, page names and text encoding of
+# the corpus being crawled
+PAGES = None
+
+# Number of random surfers advanced together when sampling with NumPy
+WALKERS = 4096
+
+# Number of steps each of many surfers takes before its pages are counted
+BURN_IN = 50
+
+# Number of samples taken by each task of the parallel sampler
+CHUNK = 1000000
+
+# In worker processes, the link graph and parameters shared by every task
+GRAPH = None
+
+# Number of samples in each batch of the adaptive sampler, the fewest
+# steps each surfer takes per batch, and the fewest batches taken
+BATCH = 1000
+BATCH_STEPS = 50
+MIN_BATCHES = 10
+
+# Most samples the adaptive sampler takes, however wide its intervals
+MAX_SAMPLES = 10 ** 8
+
+# Standard normal quantile of the adaptive sampler's confidence intervals
+Z = 1.96
+
+# Largest L1 change between iterations at which sparse ranks have converged
+TOLERANCE = 1e-6
+
 
 def main():
     if len(sys.argv) != 2:
@@ -22,22 +81,46 @@ def main():
         print(f"  {page}: {ranks[page]:.4f}")
 
 
-def crawl(directory):
+def crawl(directory, cache=True):
     """
     Parse a directory of HTML pages and check for links to other pages.
     Return a dictionary where each key is a page, and values are
     a list of all other pages in the corpus that are linked to by the page.
+
+    If `cache` is true, the links of every page are saved in the
+    directory along with each file's size and modification time, and
+    later crawls only parse the files that have changed since.
     """
     pages = dict()
+    cached = load_links(directory) if cache else dict()
+    entries = dict()
+    changed = False
 
     # Extract all links from HTML files
-    for filename in os.listdir(directory):
+    for file in os.scandir(directory):
+        filename = file.name
         if not filename.endswith(".html"):
             continue
-        with open(os.path.join(directory, filename)) as f:
-            contents = f.read()
-            links = re.findall(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", contents)
-            pages[filename] = set(links) - {filename}
+        stat = file.stat()
+        entry = cached.get(filename)
+
+        # Reuse the links of files unchanged since they were cached
+        if entry is not None and entry[:2] == (stat.st_size, stat.st_mtime_ns):
+            links = entry[2]
+        else:
+            with open(file.path) as f:
+                contents = f.read()
+                links = re.findall(
+                    r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", contents
+                )
+                links = set(links) - {filename}
+            changed = True
+        entries[filename] = (stat.st_size, stat.st_mtime_ns, links)
+        pages[filename] = set(links)
+
+    # Save the links again if any file was added, changed or removed
+    if cache and (changed or len(entries) != len(cached)):
+        save_links(directory, entries)
 
     # Only include links to other pages in the corpus
     for filename in pages:
@@ -49,6 +132,176 @@ def crawl(directory):
     return pages
 
 
+def load_links(directory):
+    """
+    Return a dictionary mapping each file name in the link cache of
+    `directory` to a tuple of the file's size and modification time in
+    nanoseconds when it was parsed, and the set of its links. Return an
+    empty dictionary if there is no cache or it cannot be read.
+    """
+    try:
+        with open(os.path.join(directory, CACHE), "rb") as f:
+            data = f.read()
+        magic, names, files, links = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            return dict()
+
+        # Read the table of names, then each file's name, metadata and
+        # links as ids into the table, in compressed sparse row form
+        offset = HEADER.size
+        lengths, offset = unpack_array(data, offset, "I", names)
+        blob = data[offset:offset + sum(lengths)]
+        offset += len(blob)
+        file_ids, offset = unpack_array(data, offset, "I", files)
+        sizes, offset = unpack_array(data, offset, "q", files)
+        mtimes, offset = unpack_array(data, offset, "q", files)
+        indptr, offset = unpack_array(data, offset, "q", files + 1)
+        indices, offset = unpack_array(data, offset, "I", links)
+
+        table = []
+        start = 0
+        for length in lengths:
+            table.append(blob[start:start + length].decode("utf-8"))
+            start += length
+        return {
+            table[file_ids[i]]: (sizes[i], mtimes[i], set(
+                map(table.__getitem__, indices[indptr[i]:indptr[i + 1]])
+            ))
+            for i in range(files)
+        }
+    except (OSError, ValueError, IndexError, struct.error):
+        return dict()
+
+
+def save_links(directory, entries):
+    """
+    Save the link cache of `directory`, where `entries` maps each file
+    name to a tuple of its size, its modification time in nanoseconds
+    and its set of links. Failures to write, such as in a read-only
+    directory, are ignored.
+    """
+    ids = dict()
+    file_ids = array.array("I")
+    sizes = array.array("q")
+    mtimes = array.array("q")
+    indptr = array.array("q", [0])
+    indices = array.array("I")
+
+    # Files modified just now could change again without their size or
+    # modification time changing, so store them to be parsed again
+    recent = time.time_ns() - RACY_NS
+    for filename, (size, mtime, links) in entries.items():
+        file_ids.append(ids.setdefault(filename, len(ids)))
+        sizes.append(size if mtime < recent else -1)
+        mtimes.append(mtime)
+        indices.extend(ids.setdefault(link, len(ids)) for link in links)
+        indptr.append(len(indices))
+
+    names = [name.encode("utf-8") for name in ids]
+    lengths = array.array("I", [len(name) for name in names])
+    path = os.path.join(directory, CACHE)
+    try:
+        with open(path + ".tmp", "wb") as f:
+            f.write(HEADER.pack(
+                MAGIC, len(names), len(file_ids), len(indices)
+            ))
+            write_array(f, lengths)
+            f.write(b"".join(names))
+            for values in [file_ids, sizes, mtimes, indptr, indices]:
+                write_array(f, values)
+        os.replace(path + ".tmp", path)
+    except OSError:
+        pass
+
+
+def unpack_array(data, offset, typecode, count):
+    """
+    Return an array of `count` little-endian values of type `typecode`
+    read from the bytes `data` at `offset`, and the offset just past it.
+    Raise ValueError if `data` is too short.
+    """
+    values = array.array(typecode)
+    end = offset + count * values.itemsize
+    if end > len(data):
+        raise ValueError("link cache is truncated")
+    values.frombytes(data[offset:end])
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values, end
+
+
+def write_array(f, values):
+    """
+    Write an array to the binary file `f` as little-endian values.
+    """
+    if sys.byteorder == "big":
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    values.tofile(f)
+
+
+def parallel_crawl(directory, processes=None):
+    """
+    Parse a directory of HTML pages like `crawl`, returning the same
+    dictionary, but scan the files across a pool of processes.
+
+    Every worker is given the table of page names once, when it starts.
+    It searches the raw bytes of each file with a compiled regular
+    expression, mapping large files into memory rather than reading
+    them, and sends back only the links to other pages in the table.
+    The (page, links) pairs stream back in directory order.
+    """
+    filenames = [
+        filename for filename in os.listdir(directory)
+        if filename.endswith(".html")
+    ]
+    table = (directory, frozenset(filenames))
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes == 1:
+        init_crawler(table)
+        return dict(zip(filenames, map(scan_links, filenames)))
+    with multiprocessing.Pool(
+        processes, initializer=init_crawler, initargs=(table,)
+    ) as pool:
+        return dict(zip(
+            filenames,
+            pool.imap(scan_links, filenames, chunksize=CRAWL_CHUNK)
+        ))
+
+
+def init_crawler(table):
+    """
+    Stores the directory and page names of the corpus being crawled in a
+    worker process.
+    """
+    global PAGES
+    directory, pages = table
+    PAGES = (directory, pages, locale.getpreferredencoding(False))
+
+
+def scan_links(filename):
+    """
+    Return the set of links from the HTML file `filename` to other pages
+    in the corpus, decoded as when the file is opened as text.
+    """
+    directory, pages, encoding = PAGES
+    with open(os.path.join(directory, filename), "rb") as f:
+
+        # Read small files whole, and map larger files into memory
+        data = f.read(MMAP_SIZE)
+        if len(data) < MMAP_SIZE:
+            links = set(LINK.findall(data))
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                links = set(LINK.findall(data))
+
+    # Only include links to other pages in the corpus
+    links = {link.decode(encoding) for link in links}
+    return (links & pages) - {filename}
+
+
 def transition_model(corpus, page, damping_factor):
     """
     Return a probability distribution over which page to visit next,
@@ -83,7 +336,7 @@ def transition_model(corpus, page, damping_factor):
     return dictionary
 
 
-def sample_pagerank(corpus, damping_factor, n):
+def sample_pagerank(corpus, damping_factor, n, stats=None):
     """
     Return PageRank values for each page by sampling `n` pages
     according to transition model, starting with a page at random.
@@ -91,32 +344,39 @@ def sample_pagerank(corpus, damping_factor, n):
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
+
+    If `stats` is a dictionary, the number of samples, the seconds taken
+    and the throughput in samples per second are stored in it.
     """
+    start = time.perf_counter()
+
     # Create dictionary to keep track of number of times page was visited
     count_dictionary = {}
     for link in corpus:
         count_dictionary[link] = 0
 
+    # Store pages and links as lists once, so each step takes constant
+    # time instead of building the whole transition model
+    pages = list(corpus.keys())
+    links = {}
+    for page in corpus:
+        links[page] = list(corpus[page])
+
     # Update dictionary with first sample picked at random
-    page = random.choice(list(corpus.keys()))
+    page = random.choice(pages)
     count_dictionary[page] += 1
 
     # Surf through pages
     for i in range(n - 1):
 
-        # Get probabilities for next page to be entered
-        probability_dict = transition_model(corpus, page, damping_factor)
+        # With probability 1 - damping_factor, or if the page has no links,
+        # go to any page at random, as in the transition model
+        if not links[page] or random.random() >= damping_factor:
+            page = random.choice(pages)
 
-        # Create list of keys and list of values from dictionary, with same indexes
-        page_list = []
-        weight_list = []
-        for key in probability_dict:
-            page_list.append(key)
-            weight_list.append(probability_dict[key])
-
-        # Get a page using the probabilities
-        one_item_list = random.choices(page_list, weights=weight_list)
-        page = one_item_list[0]
+        # Else, follow one of the page's links at random
+        else:
+            page = random.choice(links[page])
 
         # Update count_dictionary
         count_dictionary[page] += 1
@@ -125,10 +385,257 @@ def sample_pagerank(corpus, damping_factor, n):
     for link in count_dictionary:
         count_dictionary[link] /= n
 
+    if stats is not None:
+        record_throughput(stats, n, time.perf_counter() - start)
+
     # Return dictionary with ranks
     return count_dictionary
 
 
+def record_throughput(stats, samples, seconds):
+    """
+    Store the number of samples drawn, the seconds taken, and the
+    samples per second in the dictionary `stats`.
+    """
+    stats["samples"] = samples
+    stats["seconds"] = seconds
+    stats["samples_per_second"] = samples / seconds if seconds else math.inf
+
+
+def vector_sample_pagerank(corpus, damping_factor, n, walkers=WALKERS,
+                           seed=None, stats=None):
+    """
+    Return PageRank values for each page by sampling `n` pages with many
+    random surfers at once, each starting at a page at random and moving
+    according to the transition model.
+
+    Return a dictionary in the same format as `sample_pagerank`. `seed`
+    makes the samples reproducible, and `stats` is filled in as by
+    `sample_pagerank`.
+    """
+    import numpy as np
+
+    start = time.perf_counter()
+    pages, indptr, indices = link_arrays(corpus)
+    counts = surf(
+        indptr, indices, damping_factor, n, walkers,
+        np.random.default_rng(seed)
+    )
+    ranks = dict(zip(pages, (counts / n).tolist()))
+
+    if stats is not None:
+        record_throughput(stats, n, time.perf_counter() - start)
+    return ranks
+
+
+def parallel_sample_pagerank(corpus, damping_factor, n, processes=None,
+                             seed=None, walkers=WALKERS, stats=None):
+    """
+    Return PageRank values for each page by sampling `n` pages across a
+    pool of processes, each running `vector_sample_pagerank`'s surfers.
+
+    The samples are split into tasks of CHUNK samples. Every task draws
+    from its own random stream, spawned from `seed`, and the counts of
+    all tasks are added up, so a given seed gives exactly the same ranks
+    however many processes are used and in whatever order tasks finish.
+    Return a dictionary in the same format as `sample_pagerank`, and fill
+    in `stats` as it does.
+    """
+    import numpy as np
+
+    start = time.perf_counter()
+    pages, indptr, indices = link_arrays(corpus)
+    sizes = [CHUNK] * (n // CHUNK) + ([n % CHUNK] if n % CHUNK else [])
+    streams = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = list(zip(sizes, streams))
+
+    # Give every worker one read-only copy of the graph when it starts
+    graph = (indptr, indices, damping_factor, walkers)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes == 1 or len(tasks) == 1:
+        init_sampler(graph)
+        results = map(sample_task, tasks)
+        counts = sum(results, np.zeros(len(pages), dtype=np.int64))
+    else:
+        with multiprocessing.Pool(
+            processes, initializer=init_sampler, initargs=(graph,)
+        ) as pool:
+            counts = sum(
+                pool.imap(sample_task, tasks),
+                np.zeros(len(pages), dtype=np.int64)
+            )
+    ranks = dict(zip(pages, (counts / n).tolist()))
+
+    if stats is not None:
+        record_throughput(stats, n, time.perf_counter() - start)
+    return ranks
+
+
+def adaptive_sample_pagerank(corpus, damping_factor, tolerance=0.001,
+                             z=Z, batch=BATCH, max_samples=MAX_SAMPLES,
+                             seed=None, stats=None):
+    """
+    Return PageRank values for each page by sampling in batches until
+    every value is within `tolerance` of the true PageRank, at the
+    confidence level of the standard normal quantile `z`, or until
+    `max_samples` samples have been taken. If `max_samples` is not a
+    multiple of `batch`, the last batch is cut short to end there.
+
+    Confidence intervals come from batch means: the surfers carry on from
+    one batch to the next, and the spread of each page's rank between
+    batches, which are long enough to be nearly independent, estimates
+    the error of the overall rank.
+
+    Return a dictionary in the same format as `sample_pagerank`. If
+    `stats` is a dictionary, it is filled in as by `sample_pagerank`,
+    along with the number of batches and the achieved `error`, the
+    largest half-width of any page's confidence interval.
+    """
+    import numpy as np
+
+    start = time.perf_counter()
+    pages, indptr, indices = link_arrays(corpus)
+
+    # Use few enough surfers that each takes many steps per batch
+    walkers = max(1, min(WALKERS, batch // BATCH_STEPS))
+    sizes = itertools.chain(
+        itertools.repeat(batch, max_samples // batch),
+        [max_samples % batch] if max_samples % batch else []
+    )
+    batches = surf_batches(
+        indptr, indices, damping_factor, sizes, walkers,
+        np.random.default_rng(seed)
+    )
+
+    # Keep running sums of each page's rank, and its square, per batch,
+    # weighted by the size of the batch relative to a full one, since
+    # the rank of a batch half as long varies twice as much
+    totals = np.zeros(len(pages))
+    squares = np.zeros(len(pages))
+    weights = 0
+    samples = 0
+    count = 0
+    error = math.inf
+    for counts in batches:
+        size = int(counts.sum())
+        weight = size / batch
+        ranks = counts / size
+        totals += weight * ranks
+        squares += weight * ranks ** 2
+        weights += weight
+        samples += size
+        count += 1
+
+        # Stop once every confidence interval is narrow enough
+        if count >= MIN_BATCHES:
+            spread = np.maximum(squares - totals ** 2 / weights, 0)
+            error = z * math.sqrt(spread.max() / (count - 1) / weights)
+            if error <= tolerance:
+                break
+
+    ranks = dict(zip(pages, (totals / weights).tolist()))
+
+    if stats is not None:
+        record_throughput(stats, samples, time.perf_counter() - start)
+        stats["batches"] = count
+        stats["error"] = error
+    return ranks
+
+
+def init_sampler(graph):
+    """Stores the link graph shared by every task in a worker process."""
+    global GRAPH
+    GRAPH = graph
+
+
+def sample_task(task):
+    """
+    Take one task's samples of `parallel_sample_pagerank` in a worker
+    process. Return an array with the number of samples of each page.
+    """
+    import numpy as np
+
+    samples, stream = task
+    indptr, indices, damping_factor, walkers = GRAPH
+    return surf(
+        indptr, indices, damping_factor, samples, walkers,
+        np.random.default_rng(stream)
+    )
+
+
+def surf(indptr, indices, damping_factor, n, walkers, rng,
+         burn_in=BURN_IN):
+    """
+    Take `n` samples with up to `walkers` random surfers moving at once
+    over the links in the compressed sparse row arrays `indptr` and
+    `indices`, drawing random numbers from the NumPy generator `rng`.
+    Surfers start at pages at random and take `burn_in` steps before
+    their pages are counted, so that short runs of many surfers are not
+    biased towards their starting pages.
+    Return an array with the number of samples of each page.
+    """
+    return next(surf_batches(
+        indptr, indices, damping_factor, [n], min(walkers, n), rng, burn_in
+    ))
+
+
+def surf_batches(indptr, indices, damping_factor, sizes, walkers, rng,
+                 burn_in=BURN_IN):
+    """
+    Yield arrays with the number of samples of each page in successive
+    batches of as many samples as each number in the iterable `sizes`,
+    taken by the same surfers as in `surf`, which carry on from one batch
+    to the next.
+    """
+    import numpy as np
+
+    pages = len(indptr) - 1
+    walkers = max(1, walkers)
+
+    # Start every surfer at a page at random
+    positions = rng.integers(pages, size=walkers)
+    for _ in range(burn_in):
+        positions = surf_step(positions, indptr, indices, damping_factor, rng)
+
+    for size in sizes:
+        counts = np.zeros(pages, dtype=np.int64)
+        taken = 0
+        while True:
+            step = positions[:min(walkers, size - taken)]
+            counts += np.bincount(step, minlength=pages)
+            taken += len(step)
+            positions = surf_step(
+                positions, indptr, indices, damping_factor, rng
+            )
+            if taken >= size:
+                break
+        yield counts
+
+
+def surf_step(positions, indptr, indices, damping_factor, rng):
+    """
+    Return the pages that surfers at `positions` move to next, according
+    to the transition model.
+    """
+    import numpy as np
+
+    pages = len(indptr) - 1
+    degrees = indptr[positions + 1] - indptr[positions]
+
+    # Surfers go to any page at random with probability
+    # 1 - damping_factor, or if their page has no links
+    following = degrees > 0
+    following &= rng.random(len(positions)) < damping_factor
+    moved = rng.integers(pages, size=len(positions))
+
+    # Others follow one of their page's links at random
+    current = positions[following]
+    offsets = rng.random(len(current)) * degrees[following]
+    moved[following] = indices[indptr[current] + offsets.astype(np.int64)]
+    return moved
+
+
 def iterate_pagerank(corpus, damping_factor):
     """
     Return PageRank values for each page by iteratively updating
@@ -150,16 +657,13 @@ def iterate_pagerank(corpus, damping_factor):
     for page in corpus:
         links_to[page] = []
     for page in corpus:
-
-        # If page has no links, it should link to every page
-        if len(corpus[page]) == 0:
-            for link in corpus:
-                links_to[link].append(page)
-
-        # Else, it links only to its links
         for link in corpus[page]:
             links_to[link].append(page)
 
+    # Pages with no links link to every page, so rather than adding them
+    # to every list, keep them apart and share their rank as one amount
+    dangling = [page for page in corpus if len(corpus[page]) == 0]
+
     # Create variables for further use in following loop
     constant_term = (1 - damping_factor) / len(corpus)
     rank_copy = copy.deepcopy(rank_dictionary)
@@ -170,21 +674,20 @@ def iterate_pagerank(corpus, damping_factor):
 
         update = False
 
+        # Rank every page receives from the pages with no links
+        dangling_rank = 0
+        for link in dangling:
+            dangling_rank += rank_dictionary[link] / len(corpus)
+
         # Update ranks based on previous iteration
         for page in corpus:
 
             # Second term of iterative algorithm
-            summation = 0
+            summation = dangling_rank
             for link in links_to[page]:
 
-                # If page has no link, it links to everyone
-                if len(corpus[link]) == 0:
-                    num_links = len(corpus)
-                else:
-                    num_links = len(corpus[link])
-
                 # Add: (link's rank divided by number of links in link)
-                summation += (rank_dictionary[link] / num_links)
+                summation += (rank_dictionary[link] / len(corpus[link]))
             summation *= damping_factor
 
             # Sum both terms of iterative algorithm
@@ -207,5 +710,234 @@ def iterate_pagerank(corpus, damping_factor):
     return rank_dictionary
 
 
+def sparse_pagerank(corpus, damping_factor, tolerance=TOLERANCE,
+                    initial=None):
+    """
+    Return PageRank values for each page by power iteration over a sparse
+    transition matrix, until the L1 distance between successive rank
+    vectors falls below `tolerance`.
+
+    Return a dictionary in the same format as `iterate_pagerank`.
+    Memory and time per iteration are proportional to the number of
+    pages plus the number of links, so this scales to millions of pages.
+    If `initial` maps pages to earlier ranks, iteration starts from them,
+    with equal ranks for pages missing from it.
+    """
+    import numpy as np
+
+    pages, indptr, indices = link_arrays(corpus)
+    matrix, dangling = transition_matrix(indptr, indices)
+    n = len(pages)
+
+    # Start with the initial ranks if given, else equal ranks for all pages
+    if initial is None:
+        ranks = np.full(n, 1 / n)
+    else:
+        ranks = np.array([initial.get(page, 1 / n) for page in pages])
+        ranks /= ranks.sum()
+    while True:
+
+        # Pages with no links share their rank equally with every page
+        dangling_rank = ranks[dangling].sum()
+        updated = (1 - damping_factor) / n + damping_factor * (
+            matrix @ ranks + dangling_rank / n
+        )
+
+        # Stop once ranks change by less than the tolerance in total
+        change = np.abs(updated - ranks).sum()
+        ranks = updated
+        if change < tolerance:
+            break
+
+    return dict(zip(pages, ranks.tolist()))
+
+
+def update_pagerank(corpus, ranks, changes, damping_factor, method="warm",
+                    tolerance=TOLERANCE):
+    """
+    Return PageRank values for each page after some pages are added,
+    removed or relinked, starting from the earlier PageRank values
+    `ranks` rather than from equal ranks.
+
+    `changes` maps each changed page to its new set of links, or to None
+    if the page was removed, and is applied to `corpus` in place. With
+    method "warm", `sparse_pagerank` iterates from the earlier ranks.
+    With method "push", only the corrections caused by the changes are
+    spread along links from the changed pages, and only as far as they
+    matter, so small changes take a fraction of a recompute whenever
+    their effect stays local to part of the corpus. Corrections reach
+    every page of densely interlinked corpora at tight tolerances, where
+    "warm" is faster.
+
+    Either way the result is within `tolerance` of the true PageRank in
+    L1 distance. With method "push", any error the earlier ranks had is
+    added to that. This bounds the error itself, so it is stricter than
+    the `tolerance` of `sparse_pagerank`, which bounds only the last step.
+    """
+    if method not in ("warm", "push"):
+        raise ValueError(f"unknown method {method}")
+    if method == "warm":
+
+        # Each iteration shrinks the error by the damping factor, so the
+        # error left is at most damping / (1 - damping) times the last step
+        apply_changes(corpus, changes)
+        return sparse_pagerank(
+            corpus, damping_factor,
+            tolerance * (1 - damping_factor) / damping_factor, ranks
+        )
+
+    # Ranks are proportional to scores where every page has a score of 1
+    # plus its share of the scores of pages linking to it, as the rank
+    # of pages with no links goes to every page equally, like teleports.
+    # Find the factor between the two before the corpus changes.
+    dangling_rank = sum(
+        ranks.get(page, 0) for page in corpus if len(corpus[page]) == 0
+    )
+    scale = len(corpus) / (
+        (1 - damping_factor) + damping_factor * dangling_rank
+    )
+    previous = apply_changes(corpus, changes)
+    scores = {page: ranks.get(page, 0) * scale for page in corpus}
+
+    # Find how far off the scores are because of the changes: pages
+    # whose links changed give their share to different pages, and
+    # new pages are missing their own score of 1
+    residual = collections.defaultdict(float)
+    for page, old_links in previous.items():
+        links = corpus.get(page)
+        if old_links is None:
+            residual[page] += 1
+        score = ranks.get(page, 0) * scale
+        for before, sign in [(old_links, -1), (links, 1)]:
+            if before:
+                share = sign * damping_factor * score / len(before)
+                for link in before:
+                    residual[link] += share
+    for page in previous:
+        if page not in corpus:
+            residual.pop(page, None)
+
+    # Spread corrections until they add up to little enough that the
+    # scores they would still change, at most 1 / (1 - damping) times
+    # as much, keep the normalized ranks within the tolerance
+    push_scores(
+        corpus, scores, residual, damping_factor,
+        tolerance * (1 - damping_factor) * sum(scores.values()) / 2
+    )
+    total = sum(scores.values())
+    return {page: score / total for page, score in scores.items()}
+
+
+def apply_changes(corpus, changes):
+    """
+    Update `corpus` in place with `changes`, which maps pages to their
+    new set of links, or to None for pages that were removed. Links to
+    pages not in the corpus, or from a page to itself, are left out.
+
+    Return a dictionary mapping every page whose links changed, including
+    pages that linked to removed pages, to its earlier set of links, or
+    to None if the page is new.
+    """
+    previous = dict()
+    removed = set()
+    for page, links in changes.items():
+        previous.setdefault(page, corpus.get(page))
+        if links is None:
+            corpus.pop(page, None)
+            removed.add(page)
+        else:
+            corpus[page] = set(links)
+
+    # Only include links to other pages in the corpus
+    for page in changes:
+        if page in corpus:
+            corpus[page] = set(
+                link for link in corpus[page]
+                if link in corpus and link != page
+            )
+    if removed:
+        for page in corpus:
+            if corpus[page] & removed:
+                previous.setdefault(page, corpus[page])
+                corpus[page] = corpus[page] - removed
+    return previous
+
+
+def push_scores(corpus, scores, residual, damping_factor, budget):
+    """
+    Correct `scores` in place, given the `residual` amount each page's
+    score is off by, until the residuals add up to less than `budget`.
+
+    Each page's residual is pushed: added to its score, and shared out
+    among the residuals of the pages it links to. Pages with residuals
+    above a threshold are pushed until none is left, then the threshold
+    is lowered, so the largest corrections are spread first.
+    """
+    threshold = budget
+    while sum(abs(amount) for amount in residual.values()) >= budget:
+        queue = collections.deque(
+            page for page in residual if abs(residual[page]) > threshold
+        )
+        queued = set(queue)
+        while queue:
+            page = queue.popleft()
+            queued.remove(page)
+            amount = residual.pop(page)
+            scores[page] += amount
+
+            # Share the residual equally among the page's links
+            if len(corpus[page]) == 0:
+                continue
+            share = damping_factor * amount / len(corpus[page])
+            for link in corpus[page]:
+                residual[link] += share
+                if link not in queued and abs(residual[link]) > threshold:
+                    queued.add(link)
+                    queue.append(link)
+        threshold /= 10
+
+
+def link_arrays(corpus):
+    """
+    Number the pages of a corpus and return a tuple of the sorted list of
+    pages and the links of each page as compressed sparse row arrays:
+    the ids of the pages linked to by page `i` are
+    `indices[indptr[i]:indptr[i + 1]]`.
+    """
+    import numpy as np
+
+    pages = sorted(corpus)
+    ids = {page: i for i, page in enumerate(pages)}
+    counts = np.fromiter(
+        (len(corpus[page]) for page in pages), dtype=np.int64, count=len(pages)
+    )
+    indptr = np.zeros(len(pages) + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    indices = np.fromiter(
+        (ids[link] for page in pages for link in corpus[page]),
+        dtype=np.int64, count=indptr[-1]
+    )
+    return pages, indptr, indices
+
+
+def transition_matrix(indptr, indices):
+    """
+    Return a tuple of the sparse matrix whose entry `(i, j)` is the
+    probability of following a link from page `j` to page `i`, and
+    a boolean array of the pages with no links.
+    """
+    import numpy as np
+    from scipy.sparse import csr_matrix
+
+    n = len(indptr) - 1
+    counts = np.diff(indptr)
+    dangling = counts == 0
+
+    # Each link of a page is followed with equal probability
+    weights = np.repeat(1 / np.maximum(counts, 1), counts)
+    links = csr_matrix((weights, indices, indptr), shape=(n, n))
+    return links.T.tocsr(), dangling
+
+
 if __name__ == "__main__":
     main()